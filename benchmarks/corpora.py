@@ -0,0 +1,145 @@
+"""Reproducible synthetic corpora for the benchmarks.
+
+Every corpus is generated from a seeded ``random.Random``, so the same seed
+and size always give the same texts on every machine and Python version.
+"""
+import json
+import random
+
+from magic_profanity.magic_profanity import ProfanityFilter
+from magic_profanity.utils import get_complete_path_of_file, read_wordlist
+
+CLEAN_WORDS = (
+    "the a an and or but so to of in on at for with from about this that it is was are were be been "
+    "i you he she we they me my your our their hey hi hello thanks thank please yes no ok okay sure "
+    "lol haha nice good great cool awesome bad sad happy love like want need know think see look "
+    "game play played win lost match team today tomorrow yesterday night morning time day week "
+    "really very just still maybe never always again now later soon here there what why how when "
+    "class assessment scunthorpe cockpit passage grape shiitake title analysis button"
+).split()
+
+PUNCTUATION = ("", "", "", "", ",", ".", "!", "?", "...", "!!")
+
+
+def _wordlist():
+    return list(read_wordlist(get_complete_path_of_file("wordlist.txt")))
+
+
+def _unicode_characters():
+    with open(get_complete_path_of_file("unicode.json"), encoding="utf-8") as unicode_file:
+        return [character for character in json.load(unicode_file) if not character.isascii()]
+
+
+def _line(rng, words, length):
+    parts = []
+    for _ in range(length):
+        parts.append(rng.choice(words) + rng.choice(PUNCTUATION))
+    return " ".join(parts)
+
+
+def clean_chat(rng, count):
+    # Short chat messages without profanity, including words that contain
+    # listed words (class, cockpit, ...) to exercise near misses
+    return [_line(rng, CLEAN_WORDS, rng.randint(3, 18)) for _ in range(count)]
+
+
+def dense_profanity(rng, count):
+    swears = [word for word in _wordlist() if " " not in word]
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(swears) if rng.random() < 0.4 else rng.choice(CLEAN_WORDS)
+                 for _ in range(rng.randint(3, 18))]
+        texts.append(" ".join(word + rng.choice(PUNCTUATION) for word in words))
+    return texts
+
+
+def leetspeak(rng, count):
+    # Listed words with characters swapped for their char_map substitutes
+    char_map = ProfanityFilter().char_map
+    swears = [word for word in _wordlist() if " " not in word]
+    texts = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(3, 15)):
+            if rng.random() < 0.3:
+                word = "".join(rng.choice(char_map[char]) if char in char_map and rng.random() < 0.5 else char
+                               for char in rng.choice(swears))
+            else:
+                word = rng.choice(CLEAN_WORDS)
+            words.append(word)
+        texts.append(" ".join(words))
+    return texts
+
+
+def phrases(rng, count):
+    # Multi-word entries, and single entries split into separate letters or
+    # syllables, which exercise the lookahead over following words
+    multi_word = [word for word in _wordlist() if " " in word.strip()]
+    swears = [word for word in _wordlist() if " " not in word and len(word) > 3]
+    separators = (" ", "  ", "-", ".", "_")
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(2, 8)):
+            roll = rng.random()
+            if roll < 0.25:
+                parts.append(rng.choice(multi_word).strip())
+            elif roll < 0.45:
+                parts.append(rng.choice(separators).join(rng.choice(swears)))
+            else:
+                parts.append(_line(rng, CLEAN_WORDS, rng.randint(1, 4)))
+        texts.append(" ".join(parts))
+    return texts
+
+
+def long_documents(rng, count):
+    # Multi-paragraph documents of roughly 5-20 KB with sparse profanity
+    swears = [word for word in _wordlist() if " " not in word]
+    texts = []
+    for _ in range(max(1, count // 50)):
+        paragraphs = []
+        for _ in range(rng.randint(10, 40)):
+            words = [rng.choice(swears) if rng.random() < 0.02 else rng.choice(CLEAN_WORDS)
+                     for _ in range(rng.randint(40, 120))]
+            paragraphs.append(" ".join(words).capitalize() + ".")
+        texts.append("\n\n".join(paragraphs))
+    return texts
+
+
+def unicode_heavy(rng, count):
+    # Words mixing ASCII with accented and non-Latin letters from unicode.json,
+    # plus the occasional listed word
+    characters = _unicode_characters()
+    swears = [word for word in _wordlist() if " " not in word]
+    texts = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(3, 15)):
+            roll = rng.random()
+            if roll < 0.1:
+                words.append(rng.choice(swears))
+            elif roll < 0.6:
+                words.append("".join(rng.choice(characters) for _ in range(rng.randint(2, 9))))
+            else:
+                words.append(rng.choice(CLEAN_WORDS))
+        texts.append(" ".join(words))
+    return texts
+
+
+CORPORA = {
+    "clean_chat": clean_chat,
+    "dense_profanity": dense_profanity,
+    "leetspeak": leetspeak,
+    "phrases": phrases,
+    "long_documents": long_documents,
+    "unicode_heavy": unicode_heavy,
+}
+
+
+def build_corpus(name, count=1000, seed=0):
+    """Return corpus ``name`` with ``count`` texts generated from ``seed``.
+
+    ``long_documents`` holds one document per 50 requested texts instead.
+    """
+    # Each corpus gets its own stream, so adding one does not change the others
+    return CORPORA[name](random.Random(f"{name}:{seed}"), count)
@@ -0,0 +1,260 @@
+"""Benchmark censoring, detection, analysis, filter construction and import time.
+
+Usage::
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --baseline results.json --threshold 0.15
+
+Results are written as JSON: for every benchmark the best time per operation,
+operations per second, nanoseconds per input character where it applies,
+and the peak memory allocated while it ran, measured with tracemalloc in a
+separate pass. censor_text results also give the prefilter's false-positive
+rate: the share of the texts without profanity it could not rule out. With
+``--baseline`` the results are compared against an earlier run, and the exit
+status is 1 if any benchmark got slower by more than ``--threshold``.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Run from a checkout without installing the package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpora import CORPORA, build_corpus  # noqa: E402
+
+import magic_profanity  # noqa: E402
+from magic_profanity.magic_profanity import ProfanityFilter  # noqa: E402
+from magic_profanity.prefilter import Prefilter  # noqa: E402
+from magic_profanity.utils import get_complete_path_of_file, read_wordlist  # noqa: E402
+
+TEXT_BENCHMARKS = ("censor_text", "has_profanity", "analyze_text")
+OTHER_BENCHMARKS = ("construct", "import")
+BENCHMARKS = TEXT_BENCHMARKS + OTHER_BENCHMARKS
+
+IMPORT_CODE = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "import magic_profanity.magic_profanity\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def _best_time(function, repeat):
+    # Best of ``repeat`` timed calls after one warm-up call; the minimum is the
+    # run least disturbed by the rest of the machine
+    function()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def _peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _measure(function, operations, repeat, characters=None):
+    best, median = _best_time(function, repeat)
+    result = {
+        "operations": operations,
+        "seconds_per_op": best / operations,
+        "median_seconds_per_op": median / operations,
+        "ops_per_sec": operations / best,
+        "peak_memory_bytes": _peak_memory(function),
+    }
+    if characters:
+        result["characters"] = characters
+        result["ns_per_char"] = best / characters * 1e9
+    return result
+
+
+def _text_filters(sentiment_backend):
+    return {
+        "censor_text": ProfanityFilter(),
+        "has_profanity": ProfanityFilter(),
+        "analyze_text": ProfanityFilter(enable_sentiment=True, enable_enhancement=True,
+                                        sentiment_options={"backend": sentiment_backend}),
+    }
+
+
+def bench_texts(benchmark, profanity_filter, texts, repeat):
+    method = getattr(profanity_filter, benchmark)
+
+    def run():
+        for text in texts:
+            method(text)
+
+    return _measure(run, len(texts), repeat, sum(len(text) for text in texts))
+
+
+def prefilter_false_positive_rate(profanity_filter, texts):
+    # Share of the texts without profanity that still need the full scan
+    clean = [text for text in texts if not profanity_filter.has_profanity(text)]
+    return Prefilter(profanity_filter.censor_wordset, profanity_filter.allowed_characters).false_positive_rate(clean)
+
+
+def bench_construct(repeat):
+    words = list(read_wordlist(get_complete_path_of_file("wordlist.txt")))
+    return {
+        # Loads the precompiled snapshot when the package was built with one
+        "construct/default": _measure(ProfanityFilter, 1, repeat),
+        # Always builds the index from the words
+        "construct/words": _measure(lambda: ProfanityFilter(words), 1, repeat),
+    }
+
+
+def bench_import(repeat):
+    # Each run is a fresh interpreter; the time is measured inside it, so
+    # interpreter startup is not included
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", IMPORT_CODE], capture_output=True, text=True,
+                                check=True, cwd=ROOT)
+        times.append(float(output.stdout))
+    return {"import": {
+        "operations": 1,
+        "seconds_per_op": min(times),
+        "median_seconds_per_op": statistics.median(times),
+        "ops_per_sec": 1 / min(times),
+    }}
+
+
+def run_benchmarks(benchmarks, corpora, size, seed, repeat, sentiment_backend):
+    results = {}
+    if any(benchmark in TEXT_BENCHMARKS for benchmark in benchmarks):
+        filters = _text_filters(sentiment_backend)
+        for corpus in corpora:
+            texts = build_corpus(corpus, size, seed)
+            for benchmark in TEXT_BENCHMARKS:
+                if benchmark in benchmarks:
+                    results[f"{benchmark}/{corpus}"] = bench_texts(benchmark, filters[benchmark], texts, repeat)
+            if "censor_text" in benchmarks:
+                results[f"censor_text/{corpus}"]["prefilter_false_positive_rate"] = \
+                    prefilter_false_positive_rate(filters["censor_text"], texts)
+    if "construct" in benchmarks:
+        results.update(bench_construct(repeat))
+    if "import" in benchmarks:
+        results.update(bench_import(repeat))
+    return results
+
+
+def environment(args):
+    return {
+        "magic_profanity": magic_profanity.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "size": args.size,
+        "repeat": args.repeat,
+        "sentiment_backend": args.sentiment_backend,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return ``(name, baseline seconds, current seconds, ratio, regressed)`` rows.
+
+    Only benchmarks present in both runs are compared; a ratio above one means
+    the current run is slower.
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ratio = current["seconds_per_op"] / previous["seconds_per_op"]
+        rows.append((name, previous["seconds_per_op"], current["seconds_per_op"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1:
+            return f"{seconds * scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def print_summary(results, rows, stream):
+    for name, result in results.items():
+        line = f"{name:32} {_format_seconds(result['seconds_per_op']):>10}/op {result['ops_per_sec']:>12,.0f} ops/s"
+        if "ns_per_char" in result:
+            line += f" {result['ns_per_char']:>8.1f} ns/char"
+        if "peak_memory_bytes" in result:
+            line += f" {result['peak_memory_bytes'] / 1024:>10,.0f} KiB peak"
+        if "prefilter_false_positive_rate" in result:
+            line += f" {result['prefilter_false_positive_rate']:>6.1%} prefilter FP"
+        print(line, file=stream)
+    if rows:
+        print("\nCompared with baseline:", file=stream)
+        for name, previous, current, ratio, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:32} {_format_seconds(previous):>10} -> {_format_seconds(current):>10}"
+                  f" ({(ratio - 1) * 100:+.1f}%){flag}", file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--benchmark", action="append", choices=BENCHMARKS,
+                        help="benchmark to run, may be repeated (default: all)")
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA),
+                        help="corpus for the text benchmarks, may be repeated (default: all)")
+    parser.add_argument("--size", type=int, default=1000, help="texts per corpus (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed (default: 0)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (default: 5)")
+    parser.add_argument("--sentiment-backend", default="lexicon",
+                        help="sentiment backend for analyze_text (default: lexicon)")
+    parser.add_argument("--quick", action="store_true", help="small corpora and few runs, for smoke testing")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="slowdown counted as a regression, as a fraction (default: 0.1)")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.size = min(args.size, 50)
+        args.repeat = min(args.repeat, 2)
+
+    results = run_benchmarks(args.benchmark or BENCHMARKS, args.corpus or list(CORPORA),
+                             args.size, args.seed, args.repeat, args.sentiment_backend)
+    report = {"environment": environment(args), "benchmarks": results}
+
+    rows = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        rows = compare(results, baseline["benchmarks"], args.threshold)
+        report["comparison"] = {
+            "baseline": args.baseline,
+            "threshold": args.threshold,
+            "ratios": {name: ratio for name, _, _, ratio, _ in rows},
+            "regressions": [name for name, _, _, _, regressed in rows if regressed],
+        }
+
+    print_summary(results, rows, sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
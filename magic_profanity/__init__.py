@@ -1,11 +1,21 @@
-# magic_profanity/__init__.py
 from .magic_profanity import ProfanityFilter
-from .sentiment import SentimentAnalyzer
-from .enhancement import TextEnhancer
 
 __all__ = ["name", "__version__", "profanity", "SentimentAnalyzer", "TextEnhancer"]
 
 name = "magic_profanity"
 __version__ = "2.0.1"
 
-profanity = ProfanityFilter()
\ No newline at end of file
+
+def __getattr__(attribute):
+    # The default filter and the analyzers are created on first access, so
+    # importing the package for censoring alone does not pay for nltk.
+    if attribute == "profanity":
+        value = ProfanityFilter()
+    elif attribute == "SentimentAnalyzer":
+        from .sentiment import SentimentAnalyzer as value
+    elif attribute == "TextEnhancer":
+        from .enhancement import TextEnhancer as value
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {attribute!r}")
+    globals()[attribute] = value
+    return value
@@ -0,0 +1,95 @@
+import asyncio
+
+
+def _run_batch(target, method, kwargs, texts):
+    # (error, result) pairs, so one bad text fails only its own call
+    function = getattr(target, method)
+    outcomes = []
+    for text in texts:
+        try:
+            outcomes.append((None, function(text, **kwargs)))
+        except Exception as e:
+            outcomes.append((e, None))
+    return outcomes
+
+
+class _Batch:
+    __slots__ = ("texts", "futures", "timer")
+
+    def __init__(self):
+        self.texts = []
+        self.futures = []
+        self.timer = None
+
+
+class MicroBatcher:
+    """Coalesce concurrent calls from coroutines into batches run off the loop.
+
+    A call joins the open batch for the same target, method and arguments.
+    The batch is dispatched to ``executor`` once it holds ``max_batch_size``
+    texts or ``max_wait`` seconds after its first text arrived, whichever
+    comes first, so the event loop never scans text itself. ``executor`` is
+    any ``concurrent.futures.Executor``, by default the loop's thread pool. A
+    process pool pickles the filter with every batch, which only pays off
+    when batches are large or texts are long.
+    """
+
+    def __init__(self, executor=None, max_batch_size=64, max_wait=0.002):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer")
+        if max_wait < 0:
+            raise ValueError("max_wait must not be negative")
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.texts = 0
+        self._loop = None
+        self._open = {}
+
+    async def submit(self, target, method, text, **kwargs):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Batches left open on a loop that has since stopped can never run
+            self._loop = loop
+            self._open = {}
+        key = (target, method, tuple(sorted(kwargs.items())))
+        batch = self._open.get(key)
+        if batch is None:
+            batch = self._open[key] = _Batch()
+            batch.timer = loop.call_later(self.max_wait, self._dispatch, key)
+        future = loop.create_future()
+        batch.texts.append(text)
+        batch.futures.append(future)
+        if len(batch.texts) >= self.max_batch_size:
+            self._dispatch(key)
+        return await future
+
+    def _dispatch(self, key):
+        batch = self._open.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        self.batches += 1
+        self.texts += len(batch.texts)
+        target, method, kwargs = key
+        results = self._loop.run_in_executor(self.executor, _run_batch, target, method, dict(kwargs), batch.texts)
+        results.add_done_callback(lambda results: self._resolve(batch.futures, results))
+
+    @staticmethod
+    def _resolve(futures, results):
+        if results.cancelled():
+            outcomes = [(asyncio.CancelledError(), None)] * len(futures)
+        elif results.exception() is not None:
+            # The executor itself failed, e.g. it was shut down
+            outcomes = [(results.exception(), None)] * len(futures)
+        else:
+            outcomes = results.result()
+        for future, (error, result) in zip(futures, outcomes):
+            # Callers that were cancelled while waiting no longer want a result
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
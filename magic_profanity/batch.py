@@ -0,0 +1,67 @@
+import copy
+from collections import deque
+from itertools import islice
+
+# Filter or analyzer installed in each worker process by the pool initializer.
+_worker_target = None
+
+
+def _init_worker(target):
+    global _worker_target
+    _worker_target = target
+
+
+def _call_worker(method, kwargs, texts):
+    function = getattr(_worker_target, method)
+    return [function(text, **kwargs) for text in texts]
+
+
+def _shippable_copy(target, method):
+    from .magic_profanity import ProfanityFilter
+
+    if not isinstance(target, ProfanityFilter):
+        return target
+    worker_filter = copy.copy(target)
+    # Metrics recorded in another process would never be seen
+    worker_filter.metrics = None
+    if method == "analyze_text":
+        return worker_filter
+    # Workers only censor, so leave the sentiment and enhancement state behind.
+    worker_filter.enable_sentiment = False
+    worker_filter.sentiment_analyzer = None
+    worker_filter.enable_enhancement = False
+    worker_filter.text_enhancer = None
+    return worker_filter
+
+
+def imap_texts(target, method, texts, workers=None, chunksize=64, **kwargs):
+    """Yield ``target.method(text, **kwargs)`` for every text, in input order.
+
+    With ``workers`` greater than one the texts are spread over a process
+    pool. The target, a filter or a sentiment analyzer, is sent to each
+    worker once, by the pool initializer, rather than with every task.
+    ``texts`` is read only as results are yielded, with at most two chunks
+    per worker in flight, so an endless stream runs in constant memory.
+    """
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be a positive integer or None")
+    if not workers or workers == 1:
+        function = getattr(target, method)
+        for text in texts:
+            yield function(text, **kwargs)
+        return
+
+    # Imported here because the pool machinery is slow to import and most
+    # callers never use it
+    from concurrent.futures import ProcessPoolExecutor
+
+    texts = iter(texts)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(_shippable_copy(target, method),)) as executor:
+        pending = deque()
+        for chunk in iter(lambda: list(islice(texts, chunksize)), []):
+            pending.append(executor.submit(_call_worker, method, kwargs, chunk))
+            if len(pending) > 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,185 @@
+"""Censor, detect or analyze profanity in text files and JSONL records."""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+
+from .batch import imap_texts
+from .magic_profanity import ProfanityFilter
+
+# Mode -> ProfanityFilter method run on every text
+MODES = {"censor": "censor_text", "detect": "has_profanity", "analyze": "analyze_text"}
+FORMATS = ("text", "jsonl")
+# JSONL key the result goes to, for modes that do not replace the input field
+RESULT_FIELDS = {"detect": "contains_profanity", "analyze": "analysis"}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="magic-profanity", description=__doc__)
+    parser.add_argument("inputs", nargs="*", default=["-"], metavar="FILE",
+                        help="files to read, '-' for stdin (default: stdin)")
+    parser.add_argument("-m", "--mode", choices=MODES, default="censor",
+                        help="censor text, detect profanity only, or run analyze_text (default: censor)")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="text",
+                        help="one text per line, or one JSON object per line (default: text)")
+    parser.add_argument("--field", default="text", help="JSONL field holding the text (default: text)")
+    parser.add_argument("--output-field",
+                        help="JSONL field for the result (default: the input field when censoring, "
+                             "otherwise contains_profanity or analysis)")
+    parser.add_argument("-o", "--output", default="-", help="file to write, '-' for stdout (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--chunksize", type=int, default=256, help="texts sent to a worker at a time (default: 256)")
+    parser.add_argument("--buffer-size", type=int, default=1 << 20,
+                        help="bytes read and written at a time (default: 1 MiB)")
+    parser.add_argument("--censor-char", default="*", help="character used for censoring (default: *)")
+    parser.add_argument("--wordlist", help="file of words to use instead of the default wordlist")
+    parser.add_argument("--compiled", help="wordlist compiled with save_compiled, loaded instead of the default one")
+    parser.add_argument("--sentiment", action="store_true", help="add sentiment to analyze output")
+    parser.add_argument("--sentiment-backend", default="lexicon",
+                        help="sentiment backend, 'lexicon' or 'vader' (default: lexicon)")
+    parser.add_argument("--enhancement", action="store_true", help="add enhancement suggestions to analyze output")
+    parser.add_argument("--detailed", action="store_true", help="detailed sentiment in analyze output")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not report throughput on stderr")
+    return parser
+
+
+def create_filter(args):
+    options = {
+        "enable_sentiment": args.mode == "analyze" and args.sentiment,
+        "sentiment_options": {"backend": args.sentiment_backend},
+        "enable_enhancement": args.mode == "analyze" and args.enhancement,
+    }
+    if args.compiled:
+        return ProfanityFilter.load_compiled(args.compiled, **options)
+    if args.wordlist:
+        return ProfanityFilter(args.wordlist, **options)
+    return ProfanityFilter(**options)
+
+
+def _open(path, mode, buffer_size):
+    # newline="" and surrogateescape pass line endings and undecodable bytes
+    # through unchanged
+    if path == "-":
+        stream = sys.stdin if "r" in mode else sys.stdout
+        return open(stream.fileno(), mode, buffering=buffer_size, encoding="utf-8",
+                    errors="surrogateescape", newline="", closefd=False)
+    return open(path, mode, buffering=buffer_size, encoding="utf-8", errors="surrogateescape", newline="")
+
+
+def _lines(paths, buffer_size):
+    # Yields (location, line without its line break, line break)
+    for path in paths:
+        with _open(path, "r", buffer_size) as input_file:
+            for number, line in enumerate(input_file, 1):
+                if line.endswith("\r\n"):
+                    yield (path, number), line[:-2], "\r\n"
+                elif line.endswith("\n"):
+                    yield (path, number), line[:-1], "\n"
+                else:
+                    yield (path, number), line, ""
+
+
+class InvalidRecord(ValueError):
+    """A JSONL input line that is not valid JSON."""
+
+
+class Job:
+    def __init__(self, args):
+        self.args = args
+        self.output_field = args.output_field or RESULT_FIELDS.get(args.mode, args.field)
+        # Lines read but not yet written, oldest first; the texts of the same
+        # lines are being processed, in the same order
+        self.pending = deque()
+        self.lines = 0
+        self.characters = 0
+        self.flagged = 0
+
+    def texts(self, paths):
+        for location, line, ending in _lines(paths, self.args.buffer_size):
+            record = None
+            text = line
+            if self.args.format == "jsonl":
+                record, text = self._parse(location, line)
+            self.pending.append((line, ending, record, text))
+            self.lines += 1
+            self.characters += len(text)
+            yield text
+
+    def _parse(self, location, line):
+        if not line.strip():
+            return None, ""
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise InvalidRecord(f"{location[0]}:{location[1]}: invalid JSON - {e}") from None
+        text = record.get(self.args.field) if isinstance(record, dict) else None
+        if not isinstance(text, str):
+            # Records without the text field are passed through unchanged
+            return None, ""
+        return record, text
+
+    def format(self, result):
+        line, ending, record, text = self.pending.popleft()
+        if self.args.mode == "censor":
+            flagged = result != text
+        elif self.args.mode == "detect":
+            flagged = result
+        else:
+            flagged = result.get("contains_profanity", False)
+        self.flagged += bool(flagged)
+
+        if self.args.format == "jsonl":
+            if record is None:
+                return line + ending
+            record[self.output_field] = result
+            return json.dumps(record, ensure_ascii=False) + ending
+        if self.args.mode == "censor":
+            return result + ending
+        return json.dumps(result, ensure_ascii=False) + "\n"
+
+    def report(self, seconds, stream):
+        rate = 1 / seconds if seconds else 0.0
+        print(f"magic-profanity: {self.lines:,} lines, {self.characters:,} characters in {seconds:.2f}s "
+              f"({self.lines * rate:,.0f} lines/s, {self.characters * rate:,.0f} characters/s), "
+              f"{self.flagged:,} with profanity", file=stream)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must not be negative")
+    workers = args.workers or os.cpu_count()
+    kwargs = {}
+    if args.mode == "censor":
+        kwargs["censor_char"] = args.censor_char
+    elif args.mode == "analyze":
+        kwargs = {"censor_char": args.censor_char, "detailed": args.detailed}
+
+    profanity_filter = create_filter(args)
+    job = Job(args)
+    start = time.perf_counter()
+    results = imap_texts(profanity_filter, MODES[args.mode], job.texts(args.inputs), workers,
+                         args.chunksize, **kwargs)
+    try:
+        with _open(args.output, "w", args.buffer_size) as output_file:
+            for result in results:
+                output_file.write(job.format(result))
+    except InvalidRecord as e:
+        print(f"magic-profanity: error: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # The reader went away, e.g. piped into head
+        sys.stderr.close()
+        return 1
+
+    if not args.quiet:
+        job.report(time.perf_counter() - start, sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import importlib
+
+
+def _optional(module):
+    # numpy, pandas and pyarrow are never required; columns of their types
+    # can only come from callers that have them installed
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        return None
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _is_arrow(values):
+    return type(values).__module__.split(".")[0] == "pyarrow"
+
+
+def _factorize(values):
+    # (codes, uniques) with uniques[codes[i]] == values[i], and code -1 for
+    # the missing values None and NaN. pandas factorizes in C when it is
+    # installed; otherwise every value costs one dict lookup.
+    pandas = _optional("pandas")
+    if pandas is not None:
+        codes, uniques = pandas.factorize(values)
+        return codes, uniques.tolist()
+    index = {}
+    codes = [-1 if _is_missing(value) else index.setdefault(value, len(index)) for value in values]
+    return codes, list(index)
+
+
+def map_distinct(values, compute, boolean=False):
+    """Run ``compute`` on the distinct values of a column and scatter the results back.
+
+    ``compute`` takes a list of distinct strings and returns their results in
+    the same order. With ``boolean`` the results form a mask in which missing
+    values are False; otherwise missing values are passed through as they
+    are. The result has the type of ``values``: a NumPy array, a pandas
+    Series with the same index and name, a pyarrow array, or a list for any
+    other iterable.
+    """
+    if _is_arrow(values):
+        return _map_arrow(values, compute, boolean)
+    numpy = _optional("numpy")
+    if numpy is None:
+        values = list(values)
+        codes, uniques = _factorize(values)
+        results = compute(uniques)
+        if boolean:
+            return [code >= 0 and results[code] for code in codes]
+        return [results[code] if code >= 0 else value for code, value in zip(codes, values)]
+
+    pandas = _optional("pandas")
+    is_series = pandas is not None and isinstance(values, pandas.Series)
+    as_list = not is_series and not isinstance(values, numpy.ndarray)
+    if as_list:
+        # Filled in rather than passed to numpy.array, which would make
+        # nested sequences into extra dimensions
+        items = list(values)
+        values = numpy.empty(len(items), dtype=object)
+        values[:] = items
+    codes, uniques = _factorize(values)
+    codes = numpy.asarray(codes, dtype=numpy.intp)
+    results = compute(uniques)
+
+    # The extra last slot is what code -1, a missing value, picks up
+    table = numpy.empty(len(uniques) + 1, dtype=bool if boolean else object)
+    table[:-1] = results
+    table[-1] = False
+    scattered = table[codes]
+    if not boolean:
+        missing = codes < 0
+        if missing.any():
+            scattered[missing] = numpy.asarray(values, dtype=object)[missing]
+
+    if is_series:
+        series = pandas.Series(scattered, index=values.index, name=values.name)
+        if boolean or values.dtype == object:
+            return series
+        if isinstance(values.dtype, pandas.CategoricalDtype):
+            # Censored values are new categories
+            return series.astype("category")
+        return series.astype(values.dtype)
+    return scattered.tolist() if as_list else scattered
+
+
+def _map_arrow(values, compute, boolean):
+    import pyarrow
+
+    if isinstance(values, pyarrow.ChunkedArray):
+        values = values.combine_chunks()
+    encoded = values if isinstance(values.type, pyarrow.DictionaryType) else values.dictionary_encode()
+    results = compute(encoded.dictionary.to_pylist())
+    # take() turns the null indices of missing values into nulls
+    if boolean:
+        return pyarrow.array(results, pyarrow.bool_()).take(encoded.indices).fill_null(False)
+    return pyarrow.array(results, encoded.dictionary.type).take(encoded.indices)
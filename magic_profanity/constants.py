@@ -1,22 +1,60 @@
 from io import open
-from json import load
 from string import ascii_letters, digits
 
-from .utils import get_complete_path_of_file
+from .utils import get_complete_path_of_file, get_file_digest, load_marshalled, save_marshalled
 
-ALLOWED_CHARACTERS = set(ascii_letters) | set(digits) | {"@", "#", "%", "&", "$", "*", '"', "'"}
+BASE_CHARACTERS = set(ascii_letters) | set(digits) | {"@", "#", "%", "&", "$", "*", '"', "'"}
 file_path = get_complete_path_of_file("unicode.json")
+compiled_path = get_complete_path_of_file("unicode.marshal")
 
-try:
-    with open(file_path, "r", encoding="utf-8") as json_file:
-        additional_characters = load(json_file)
-        if isinstance(additional_characters, (list, set)):
-            ALLOWED_CHARACTERS.update(additional_characters)
-        else:
+# Compiled character sets use the save_marshalled layout with this magic and version
+MAGIC = b"MPCHARS"
+FORMAT_VERSION = 1
+
+
+def _read_additional_characters(json_path):
+    # json is imported here because importing it takes longer than loading
+    # the compiled character set
+    from json import load
+
+    try:
+        with open(json_path, "r", encoding="utf-8") as json_file:
+            additional_characters = load(json_file)
+            if isinstance(additional_characters, (list, set)):
+                return additional_characters
             print(f"Warning: Invalid format in unicode.json - expected list or set, got {type(additional_characters)}")
-except FileNotFoundError as e:
-    print(f"Error: File '{file_path}' not found - {e}")
-except IOError as e:
-    print(f"Error: IOError occurred while opening '{file_path}' - {e}")
-except ValueError as e:
-    print(f"Error: JSON parsing error in '{file_path}' - {e}")
+    except FileNotFoundError as e:
+        print(f"Error: File '{json_path}' not found - {e}")
+    except IOError as e:
+        print(f"Error: IOError occurred while opening '{json_path}' - {e}")
+    except ValueError as e:
+        print(f"Error: JSON parsing error in '{json_path}' - {e}")
+    return ()
+
+
+def load_allowed_characters(json_path=file_path, compiled_path=compiled_path):
+    """Return the allowed characters and the source of their token pattern, or None for it.
+
+    The compiled set written at build time is used when it matches
+    ``json_path``; otherwise the JSON file is parsed.
+    """
+    try:
+        payload = load_marshalled(compiled_path, MAGIC, FORMAT_VERSION, "compiled character set")
+        if payload["source"] == get_file_digest(json_path):
+            return set(payload["characters"]), payload["token_pattern"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return BASE_CHARACTERS | set(_read_additional_characters(json_path)), None
+
+
+def compile_allowed_characters(path, json_path=file_path):
+    """Precompile the allowed characters and their token pattern, so imports skip parsing unicode.json."""
+    from .engine import char_class
+
+    characters = BASE_CHARACTERS | set(_read_additional_characters(json_path))
+    save_marshalled(path, MAGIC, FORMAT_VERSION, {"characters": "".join(sorted(characters)),
+                                                  "token_pattern": char_class(characters) + "+",
+                                                  "source": get_file_digest(json_path)})
+
+
+ALLOWED_CHARACTERS, TOKEN_PATTERN_SOURCE = load_allowed_characters()
@@ -0,0 +1,206 @@
+import re
+from array import array
+from itertools import chain
+
+from .constants import ALLOWED_CHARACTERS, TOKEN_PATTERN_SOURCE
+
+ENGINES = ("trie", "legacy")
+
+# Compiled token patterns keyed by id() of the allowed character set. The set
+# itself is kept in the entry so that its id cannot be reused by another one.
+_token_patterns = {}
+# The default set as loaded; its pattern source may come precompiled
+_default_count = len(ALLOWED_CHARACTERS)
+
+
+def token_pattern(allowed_characters):
+    cached = _token_patterns.get(id(allowed_characters))
+    if cached is not None and cached[0] is allowed_characters and cached[1] == len(allowed_characters):
+        return cached[2]
+
+    if (TOKEN_PATTERN_SOURCE is not None and allowed_characters is ALLOWED_CHARACTERS
+            and len(allowed_characters) == _default_count):
+        pattern = re.compile(TOKEN_PATTERN_SOURCE)
+    else:
+        pattern = re.compile(char_class(allowed_characters) + "+" if allowed_characters else "(?!)")
+    _token_patterns[id(allowed_characters)] = (allowed_characters, len(allowed_characters), pattern)
+    return pattern
+
+
+def char_class(chars):
+    # Regex class matching any of ``chars``, which must not be empty.
+    # Consecutive code points are collapsed into ranges to keep it short.
+    ranges = []
+    for code in sorted(ord(char) for char in chars):
+        if ranges and code == ranges[-1][1] + 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    parts = []
+    for first, last in ranges:
+        parts.append(re.escape(chr(first)))
+        if last > first:
+            parts.append("-" + re.escape(chr(last)))
+    return "[" + "".join(parts) + "]"
+
+
+def tokenize(text, pattern):
+    """Return the words of ``text`` as a flat array of start and end offsets.
+
+    Word ``i`` spans ``text[tokens[2 * i]:tokens[2 * i + 1]]``. The scan is a
+    single regex pass, so every later stage indexes into the array instead of
+    walking the text again.
+    """
+    return array("q", chain.from_iterable(match.span() for match in pattern.finditer(text)))
+
+
+def iter_spans(text, index, pattern, max_words, tokens=None, counts=None):
+    """Yield ``(start, end, entry)`` for every censored span of ``text``.
+
+    A span starts at a word and covers that word plus up to ``max_words``
+    following words, either joined without the separators between them or
+    with the separators kept. Where several spans start at the same word the
+    longest one wins; spans never overlap. Words are lowercased lazily, so a
+    caller that stops early does not pay for the rest of the text. Already
+    computed ``tokens``, or a callable returning them, can be passed in to
+    skip tokenization. ``counts``, a dict of metrics counters, is incremented
+    with the work done.
+    """
+    if tokens is None:
+        tokens = tokenize(text, pattern)
+    elif callable(tokens):
+        tokens = tokens()
+    count = len(tokens) // 2
+    if counts is not None:
+        counts["tokens"] += count
+    words = []
+    separators = []
+
+    i = 0
+    while i < count:
+        last = min(count, i + max_words + 1)
+        while len(words) < last:
+            position = 2 * len(words)
+            if words:
+                separators.append(text[tokens[position - 1]:tokens[position]].lower())
+            words.append(text[tokens[position]:tokens[position + 1]].lower())
+        match = _longest_match(index, words[i:last], separators[i:last - 1], counts)
+        if match is None:
+            i += 1
+            continue
+        covered, entry = match
+        if counts is not None:
+            counts["matches"] += 1
+        yield tokens[2 * i], tokens[2 * (i + covered) - 1], entry
+        i += covered
+
+
+def _longest_match(index, words, separators, counts=None):
+    # Returns (number of words covered, entry) for the longest match that
+    # starts at words[0], or None.
+    best = _match_parts(index, words, counts=counts)
+    if len(words) > 1:
+        if counts is not None:
+            counts["lookaheads"] += 1
+        parts = [words[0]]
+        for separator, word in zip(separators, words[1:]):
+            parts.append(separator)
+            parts.append(word)
+        with_separators = _match_parts(index, parts, step=2, counts=counts)
+        if with_separators is not None and (best is None or with_separators[0] > best[0]):
+            best = with_separators
+    return best
+
+
+def _match_parts(index, parts, step=1, counts=None):
+    # Only the parts at every ``step``-th position are words; a match has to
+    # end exactly at the end of one of them.
+    if counts is not None:
+        counts["lookups"] += 1
+    hits = list(index.prefix_matches("".join(parts), counts=counts))
+    if not hits:
+        return None
+    ends = {}
+    offset = 0
+    for position, part in enumerate(parts):
+        offset += len(part)
+        if position % step == 0:
+            ends[offset] = position // step + 1
+    for length, entry in reversed(hits):
+        if length in ends:
+            return ends[length], entry
+    return None
+
+
+def censor_spans(text, spans, replacement):
+    censored = []
+    position = 0
+    for start, end, _ in spans:
+        censored.append(text[position:start])
+        censored.append(replacement)
+        position = end
+    if not censored:
+        return text
+    censored.append(text[position:])
+    return "".join(censored)
+
+
+def censor_stream(chunks, index, pattern, max_words, replacement):
+    """Censor text arriving in ``chunks`` and yield the output incrementally.
+
+    Output is identical to censoring the concatenated chunks in one go. Only
+    the tail that a later chunk could still change is held back: the last
+    ``max_words`` complete words plus a trailing partial word. A partial word
+    longer than ``index.max_length`` can never match, so it is released
+    straight away instead of being buffered until it ends.
+    """
+    carry = ""
+    in_long_word = False
+    for chunk in chunks:
+        buffer = carry + chunk
+        carry = ""
+        if in_long_word:
+            head = pattern.match(buffer)
+            head = head.end() if head else 0
+            if head:
+                yield buffer[:head]
+                buffer = buffer[head:]
+            if not buffer:
+                continue
+            in_long_word = False
+
+        tokens = tokenize(buffer, pattern)
+        count = len(tokens) // 2
+        complete = count
+        if count and tokens[-1] == len(buffer):
+            complete -= 1
+            in_long_word = tokens[-1] - tokens[-2] > index.max_length
+
+        # Spans starting before ``limit`` only involve complete words, so
+        # later chunks cannot change them. No span can run through a word
+        # longer than any variant, which also makes everything before it final.
+        limit = count if in_long_word else complete - max_words
+        for position in range(max(limit, 0), complete):
+            if tokens[2 * position + 1] - tokens[2 * position] > index.max_length:
+                limit = position + 1
+
+        starts = {tokens[2 * position]: position for position in range(count)}
+        censored = []
+        position = 0
+        for start, end, _ in iter_spans(buffer, index, pattern, max_words, tokens):
+            if starts[start] >= limit:
+                break
+            censored.append(buffer[position:start])
+            censored.append(replacement)
+            position = end
+
+        limit = max(limit, 0)
+        cut = len(buffer) if limit >= count else max(tokens[2 * limit], position)
+        censored.append(buffer[position:cut])
+        carry = buffer[cut:]
+        output = "".join(censored)
+        if output:
+            yield output
+
+    if carry:
+        yield censor_spans(carry, iter_spans(carry, index, pattern, max_words), replacement)
@@ -1,10 +1,107 @@
 # magic_profanity/enhancement.py
 import re
+from collections import Counter
+
+# A sentence of more than 20 whitespace separated words
+_LONG_SENTENCE = re.compile(r'[^\s.!?]+(?:\s+[^\s.!?]+){20}')
+# Whole words longer than three characters; a run of word characters is
+# matched from its start, so shorter runs are never matched in part
+_LONG_WORD = re.compile(r'\w{4,}')
+
+# A pattern starting with \b and without top-level alternation, so the
+# \b can be checked once for all patterns instead of per pattern
+_BOUNDARY_PATTERN = re.compile(r'\\b(?:\\.|\([^()\\]*\)|[^()|\\])*')
+
+# A pattern matching whole literal phrases only: \b, one phrase or a group of
+# alternative phrases, \b. Words are separated by single spaces.
+_PHRASE = r"[a-z0-9']+(?: [a-z0-9']+)*"
+_LITERAL_PATTERN = re.compile(rf'\\b(?:({_PHRASE})|\(({_PHRASE}(?:\|{_PHRASE})*)\))\\b', re.IGNORECASE)
+
+# Frequent words that are not worth replacing with synonyms
+_COMMON_WORDS = ('this', 'that', 'with', 'from')
+
+
+def _literal_phrases(pattern):
+    # The phrases a literal pattern matches, each as a tuple of lowercase
+    # words, or None if the pattern is not a literal one
+    match = _LITERAL_PATTERN.fullmatch(pattern)
+    if match is None:
+        return None
+    phrases = match.group(1) or match.group(2)
+    return [tuple(phrase.lower().split(' ')) for phrase in phrases.split('|')]
+
+
+def _phrases_overlap(first, second):
+    # Whether a match of one phrase can share words with a match of the other:
+    # one contains the other, or the end of one is the start of the other
+    for a, b in ((first, second), (second, first)):
+        for start in range(len(a)):
+            shared = a[start:start + len(b)]
+            if shared == b[:len(shared)]:
+                return True
+    return False
+
+
+def compile_improvement_patterns(improvement_patterns):
+    """
+    Combine improvement patterns into one regex with a named group per pattern.
+
+    One alternation only finds matches that do not overlap, so only literal
+    phrase patterns that can never overlap another pattern are combined. All
+    other patterns are scanned separately, as before.
+
+    Args:
+        improvement_patterns (dict): Regex pattern -> suggested replacements
+
+    Returns:
+        tuple: The compiled regex, a list of (category, replacements) per
+        pattern, the regex's group ``p<index>`` matching pattern ``index``, and
+        a list of (index, compiled pattern) for the patterns scanned separately
+    """
+    patterns = list(improvement_patterns)
+    phrases = [_literal_phrases(pattern) for pattern in patterns]
+    combined = []
+    for index, own in enumerate(phrases):
+        if own is not None and not any(
+                other is None or any(_phrases_overlap(a, b) for a in own for b in other)
+                for other_index, other in enumerate(phrases) if other_index != index):
+            combined.append(index)
+
+    groups = []
+    for pattern, replacements in improvement_patterns.items():
+        # Categorize the pattern once instead of for every match
+        if any(word in pattern.lower() for word in ['damn', 'stupid', 'idiot', 'dumb', 'hate']):
+            category = 'politeness_improvements'
+        elif any(word in pattern.lower() for word in ['always', 'never', 'very', 'a lot']):
+            category = 'clarity_improvements'
+        else:
+            category = 'tone_improvements'
+        groups.append((category, replacements))
+    separate = [(index, re.compile(patterns[index], re.IGNORECASE))
+                for index in range(len(patterns)) if index not in combined]
+
+    # Every default pattern starts with \b. Checking it once before the
+    # alternatives lets the scan skip positions inside words cheaply.
+    common = r'\b' if combined and all(_BOUNDARY_PATTERN.fullmatch(patterns[index]) for index in combined) else ''
+    alternatives = []
+    for index in combined:
+        # Inner groups become non-capturing so that lastgroup names the pattern
+        pattern = re.sub(r'(?<!\\)\((?!\?)', '(?:', patterns[index])
+        alternatives.append(f'(?P<p{index}>{pattern[len(common):]})')
+    if not alternatives:
+        return re.compile('(?!)'), groups, separate
+    return re.compile(f"{common}(?:{'|'.join(alternatives)})", re.IGNORECASE), groups, separate
 
 
 class TextEnhancer:
-    def __init__(self):
-        """Initialize the text enhancer with improvement patterns."""
+    def __init__(self, metrics=None):
+        """
+        Initialize the text enhancer with improvement patterns.
+
+        Args:
+            metrics (Metrics, optional): Records the time taken by ``suggest_improvements``
+        """
+        self.metrics = metrics
         # Patterns for text improvement (regex pattern -> suggested replacement)
         self.improvement_patterns = {
             # Profanity replacements - these can be gentler alternatives
@@ -31,48 +128,67 @@ class TextEnhancer:
             r'\bis being\b': ['[active voice recommendation]'],
             r'\bwas done\b': ['[active voice recommendation]']
         }
+        self._compiled_patterns = None
+        self._improvement_regex()
 
-    def suggest_improvements(self, text):
+    def suggest_improvements(self, text, lowered=None, record_metrics=True):
         """
         Analyze text and suggest improvements.
 
         Args:
             text (str): The text to analyze
+            lowered (str, optional): ``text.lower()``, if the caller already computed it
+            record_metrics (bool): Whether to record the call in ``metrics``; callers that
+                time it themselves pass False
 
         Returns:
             dict: A dictionary of suggestion categories and specific suggestions
         """
+        if self.metrics is None or not record_metrics:
+            return self._suggest_improvements(text, lowered)
+        with self.metrics.measure('enhancement.suggest_improvements'):
+            return self._suggest_improvements(text, lowered)
+
+    def _suggest_improvements(self, text, lowered):
         suggestions = {
             'tone_improvements': [],
             'clarity_improvements': [],
             'politeness_improvements': []
         }
 
-        # Check for improvement patterns
-        for pattern, replacements in self.improvement_patterns.items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                original = match.group(0)
-                suggestion = {
-                    'original': original,
-                    'context': self._get_context(text, match.start(), match.end()),
-                    'suggestions': replacements,
-                    'position': (match.start(), match.end())
-                }
-
-                # Categorize the suggestion
-                if any(word in pattern.lower() for word in ['damn', 'stupid', 'idiot', 'dumb', 'hate']):
-                    suggestions['politeness_improvements'].append(suggestion)
-                elif any(word in pattern.lower() for word in ['always', 'never', 'very', 'a lot']):
-                    suggestions['clarity_improvements'].append(suggestion)
-                else:
-                    suggestions['tone_improvements'].append(suggestion)
+        # Check for improvement patterns, most of them in a single scan
+        regex, groups, separate = self._improvement_regex()
+        found = []
+        for match in regex.finditer(text):
+            found.append((int(match.lastgroup[1:]), match.start(), match.end()))
+        for pattern_index, pattern in separate:
+            for match in pattern.finditer(text):
+                found.append((pattern_index, match.start(), match.end()))
+        # Group by pattern, in pattern order like the separate scans used to
+        found.sort()
+
+        for pattern_index, start, end in found:
+            category, replacements = groups[pattern_index]
+            suggestions[category].append({
+                'original': text[start:end],
+                'context': self._get_context(text, start, end),
+                'suggestions': replacements,
+                'position': (start, end)
+            })
 
         # Add overall text improvement suggestions
-        suggestions['overall_recommendations'] = self._get_overall_recommendations(text)
+        suggestions['overall_recommendations'] = self._get_overall_recommendations(
+            text, text.lower() if lowered is None else lowered)
 
         return suggestions
 
+    def _improvement_regex(self):
+        # Compiled at construction and again whenever improvement_patterns is changed
+        if self._compiled_patterns is None or self._compiled_patterns[0] != self.improvement_patterns:
+            snapshot = {pattern: replacements for pattern, replacements in self.improvement_patterns.items()}
+            self._compiled_patterns = (snapshot,) + compile_improvement_patterns(snapshot)
+        return self._compiled_patterns[1:]
+
     def _get_context(self, text, start, end, context_size=20):
         """Get the context surrounding a match."""
         context_start = max(0, start - context_size)
@@ -80,7 +196,7 @@ class TextEnhancer:
 
         return "..." + text[context_start:start] + "[" + text[start:end] + "]" + text[end:context_end] + "..."
 
-    def _get_overall_recommendations(self, text):
+    def _get_overall_recommendations(self, text, lowered):
         """Generate overall text recommendations."""
         recommendations = []
 
@@ -88,22 +204,14 @@ class TextEnhancer:
         if len(text) > 500:
             recommendations.append("Consider making your message more concise for better readability")
 
-        # Check sentence length
-        sentences = re.split(r'[.!?]+', text)
-        long_sentences = [s for s in sentences if len(s.split()) > 20]
-        if long_sentences:
+        # Check sentence length, in a single search
+        if _LONG_SENTENCE.search(lowered):
             recommendations.append("Consider breaking up long sentences to improve clarity")
 
         # Check for repeated words
-        words = re.findall(r'\b\w+\b', text.lower())
-        word_freq = {}
-        for word in words:
-            if len(word) > 3:  # Ignore short words
-                word_freq[word] = word_freq.get(word, 0) + 1
-
-        repeated = [word for word, freq in word_freq.items() if
-                    freq > 3 and word not in ['this', 'that', 'with', 'from']]
+        word_freq = Counter(_LONG_WORD.findall(lowered))
+        repeated = [word for word, freq in word_freq.items() if freq > 3 and word not in _COMMON_WORDS]
         if repeated:
             recommendations.append(f"Consider using synonyms for frequently used words: {', '.join(repeated)}")
 
-        return recommendations
\ No newline at end of file
+        return recommendations
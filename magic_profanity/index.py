@@ -0,0 +1,259 @@
+import copy
+import heapq
+from itertools import count
+from operator import itemgetter
+
+from .variant import VariantString, length_bounds
+
+# Key under which a trie node stores the wordlist entry that ends there. Trie
+# edges are single characters, so the empty string can never collide.
+END = ""
+
+# Every published index gets a distinct generation, e.g. for cache keys.
+_generations = count()
+
+
+class WordIndex:
+    """Compiled lookup index over a censor wordlist.
+
+    Words are stored in a character trie keyed by their original spelling and
+    the ``char_map`` substitutions are inverted into a piece -> characters map.
+    Looking up a token walks the trie with the inverted substitutions, so the
+    cost depends on the token length rather than on the number of words.
+
+    An index is treated as immutable once a filter uses it. ``updated``
+    returns a new index that copies only the trie paths it changes, so a
+    filter can swap in the result while other threads keep reading the old one.
+    """
+
+    def __init__(self, words=(), char_map=None, max_num_combinations=1):
+        self.char_map = char_map if char_map is not None else {}
+        self.max_num_combinations = max_num_combinations
+        self.generation = next(_generations)
+        self._words = {}
+        self._trie = {}
+        self._reverse = {}
+        self._piece_lengths = (1,)
+        # Length bounds over every variant of every word. Removing words
+        # leaves them as they are; loose bounds only cost a little time.
+        self.min_length = None
+        self.max_length = 0
+        self._compile_char_map()
+        for word in words:
+            self.add(word)
+
+    def __contains__(self, item):
+        if isinstance(item, VariantString):
+            return self.has_word(str(item))
+        if isinstance(item, str):
+            return self.lookup(item) is not None
+        return False
+
+    def __iter__(self):
+        for word in self.words():
+            yield VariantString(word, char_map=self.char_map)
+
+    def __len__(self):
+        return len(self._words)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} words)"
+
+    def words(self):
+        return iter(self._words)
+
+    def has_word(self, word):
+        # Whether ``word`` itself is in the wordlist, without substitutions
+        return word in self._words
+
+    def add(self, word):
+        self._insert(str(word), None)
+
+    def thawed(self):
+        # Plain WordIndex with the same words, e.g. for flattening
+        return self
+
+    def updated(self, add=(), remove=(), max_num_combinations=None):
+        index = copy.copy(self)
+        index.generation = next(_generations)
+        if max_num_combinations is not None:
+            index.max_num_combinations = max_num_combinations
+        index._words = dict(self._words)
+        index._trie = dict(self._trie)
+        # ids of the nodes this update already copied and may modify in place
+        copied = {id(index._trie)}
+        for word in remove:
+            index._delete(str(word), copied)
+        for word in add:
+            index._insert(str(word), copied)
+        return index
+
+    def _insert(self, word, copied):
+        if word in self._words:
+            return
+        self._words[word] = None
+        min_length, max_length = length_bounds(word, self.char_map)
+        self.max_length = max(self.max_length, max_length)
+        self.min_length = min_length if self.min_length is None else min(self.min_length, min_length)
+        node = self._trie
+        for char in word:
+            child = node.get(char)
+            if child is None:
+                child = {}
+            elif copied is not None and id(child) not in copied:
+                child = dict(child)
+            if copied is not None:
+                copied.add(id(child))
+            node[char] = child
+            node = child
+        node[END] = word
+
+    def _delete(self, word, copied):
+        if word not in self._words:
+            return
+        del self._words[word]
+        path = [self._trie]
+        for char in word:
+            child = path[-1][char]
+            if id(child) not in copied:
+                child = dict(child)
+                copied.add(id(child))
+                path[-1][char] = child
+            path.append(child)
+        del path[-1][END]
+        # Drop the nodes that no longer lead to any word
+        for depth in range(len(word), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][word[depth - 1]]
+
+    def lookup(self, string):
+        if self.min_length is None or not self.min_length <= len(string) <= self.max_length:
+            return None
+        for length, word in self.prefix_matches(string):
+            if length == len(string):
+                return word
+        return None
+
+    def prefix_matches(self, string, exclude=None, counts=None):
+        # Yields (length, entry) for every prefix of ``string`` that matches a
+        # word, shortest first, skipping entries in ``exclude``. The walk
+        # stops as soon as no trie path is left. The nodes it expands are
+        # added to ``counts["trie_steps"]`` if counts are given.
+        end = len(string)
+        pending = {0: {id(self._trie): self._trie}}
+        while pending:
+            pos = min(pending)
+            nodes = pending.pop(pos)
+            if counts is not None:
+                counts["trie_steps"] += len(nodes)
+            for node in nodes.values():
+                word = node.get(END)
+                if word is not None and (exclude is None or word not in exclude):
+                    yield pos, word
+                    break
+            for length in self._piece_lengths:
+                if pos + length > end:
+                    break
+                chars = self._candidates(string[pos:pos + length])
+                if not chars:
+                    continue
+                reached = None
+                for node in nodes.values():
+                    for char in chars:
+                        child = node.get(char)
+                        if child is not None:
+                            if reached is None:
+                                reached = pending.setdefault(pos + length, {})
+                            reached[id(child)] = child
+
+    def _compile_char_map(self):
+        reverse = {}
+        for char, substitutions in self.char_map.items():
+            for piece in substitutions:
+                if piece:
+                    reverse.setdefault(piece, []).append(char)
+        # Characters that are not keys of char_map only ever match themselves.
+        for piece, chars in reverse.items():
+            if len(piece) == 1 and piece not in self.char_map:
+                chars.append(piece)
+        self._reverse = {piece: tuple(chars) for piece, chars in reverse.items()}
+        self._piece_lengths = tuple(sorted({len(piece) for piece in reverse} | {1}))
+
+    def _candidates(self, piece):
+        chars = self._reverse.get(piece)
+        if chars is None and len(piece) == 1 and piece not in self.char_map:
+            return (piece,)
+        return chars or ()
+
+
+class OverlayIndex(WordIndex):
+    """Index that adds and allows words on top of a shared base index.
+
+    The base is never copied or modified: lookups walk the base, skipping the
+    allowed words, and a small index of the added words, so an overlay costs
+    memory in proportion to its own words only. The overlay keeps the base
+    it was created with; ``rebased`` moves it onto a newer one.
+    """
+
+    def __init__(self, base, words=(), allowed=(), max_num_combinations=None):
+        self.base = base
+        self.char_map = base.char_map
+        self._allowed = frozenset(allowed)
+        self._extra = WordIndex(char_map=base.char_map)
+        for word in words:
+            if word not in self._allowed and not self.base.has_word(word):
+                self._extra.add(word)
+        self._refresh(max_num_combinations)
+
+    def __len__(self):
+        return self._length
+
+    def words(self):
+        for word in self.base.words():
+            if word not in self._allowed:
+                yield word
+        yield from self._extra.words()
+
+    def has_word(self, word):
+        return self._extra.has_word(word) or (word not in self._allowed and self.base.has_word(word))
+
+    def add(self, word):
+        raise TypeError("OverlayIndex is read-only, use updated() to get a modified copy")
+
+    def thawed(self):
+        return WordIndex(self.words(), char_map=self.char_map, max_num_combinations=self.max_num_combinations)
+
+    def updated(self, add=(), remove=(), max_num_combinations=None):
+        add = [str(word) for word in add]
+        remove = set(str(word) for word in remove)
+        index = copy.copy(self)
+        index._allowed = frozenset((self._allowed - set(add)) | {word for word in remove if self.base.has_word(word)})
+        index._extra = self._extra.updated([word for word in add if not self.base.has_word(word)], remove)
+        index._refresh(max_num_combinations if max_num_combinations is not None else self.max_num_combinations)
+        return index
+
+    def rebased(self, base):
+        index = copy.copy(self)
+        index.base = base
+        index._extra = self._extra.updated(remove=[word for word in self._extra.words() if index.base.has_word(word)])
+        index._refresh(self.max_num_combinations)
+        return index
+
+    def prefix_matches(self, string, exclude=None, counts=None):
+        if exclude:
+            exclude = self._allowed | exclude
+        base_matches = self.base.prefix_matches(string, exclude or self._allowed or None, counts)
+        if not self._extra:
+            return base_matches
+        return heapq.merge(base_matches, self._extra.prefix_matches(string, exclude, counts), key=itemgetter(0))
+
+    def _refresh(self, max_num_combinations):
+        self.generation = next(_generations)
+        self.max_num_combinations = max(self.base.max_num_combinations, self._extra.max_num_combinations,
+                                        max_num_combinations or 1)
+        self.max_length = max(self.base.max_length, self._extra.max_length)
+        lengths = [index.min_length for index in (self.base, self._extra) if index.min_length is not None]
+        self.min_length = min(lengths) if lengths else None
+        self._length = (len(self.base) - sum(1 for word in self._allowed if self.base.has_word(word))
+                        + len(self._extra))
@@ -0,0 +1,386 @@
+import math
+import string
+
+from .utils import get_complete_path_of_file, get_file_digest, load_marshalled, save_marshalled
+
+DEFAULT_LEXICON = 'sentiment_lexicon.txt'
+COMPILED_LEXICON = 'sentiment_lexicon.marshal'
+
+# Compiled lexicons use the save_marshalled layout with this magic and
+# version, and a {'lexicon': dict, 'source': digest} payload.
+MAGIC = b'MPLEXI'
+FORMAT_VERSION = 1
+
+# The rules and constants below are those of VADER (Hutto & Gilbert, 2014) as
+# implemented by nltk.sentiment.vader, so both backends score text the same way.
+B_INCR = 0.293
+B_DECR = -0.293
+C_INCR = 0.733
+N_SCALAR = -0.74
+
+NEGATE = frozenset([
+    'aint', 'arent', 'cannot', 'cant', 'couldnt', 'darent', 'didnt', 'doesnt',
+    "ain't", "aren't", "can't", "couldn't", "daren't", "didn't", "doesn't",
+    'dont', 'hadnt', 'hasnt', 'havent', 'isnt', 'mightnt', 'mustnt', 'neither',
+    "don't", "hadn't", "hasn't", "haven't", "isn't", "mightn't", "mustn't",
+    'neednt', "needn't", 'never', 'none', 'nope', 'nor', 'not', 'nothing',
+    'nowhere', 'oughtnt', 'shant', 'shouldnt', 'uhuh', 'wasnt', 'werent',
+    "oughtn't", "shan't", "shouldn't", 'uh-uh', "wasn't", "weren't", 'without',
+    'wont', 'wouldnt', "won't", "wouldn't", 'rarely', 'seldom', 'despite',
+])
+
+BOOSTER_DICT = dict.fromkeys([
+    'absolutely', 'amazingly', 'awfully', 'completely', 'considerably', 'decidedly',
+    'deeply', 'effing', 'enormously', 'entirely', 'especially', 'exceptionally',
+    'extremely', 'fabulously', 'flipping', 'flippin', 'fricking', 'frickin',
+    'frigging', 'friggin', 'fully', 'fucking', 'greatly', 'hella', 'highly',
+    'hugely', 'incredibly', 'intensely', 'majorly', 'more', 'most', 'particularly',
+    'purely', 'quite', 'really', 'remarkably', 'so', 'substantially', 'thoroughly',
+    'totally', 'tremendously', 'uber', 'unbelievably', 'unusually', 'utterly', 'very',
+], B_INCR)
+BOOSTER_DICT.update(dict.fromkeys([
+    'almost', 'barely', 'hardly', 'just enough', 'kind of', 'kinda', 'kindof',
+    'kind-of', 'less', 'little', 'marginally', 'occasionally', 'partly', 'scarcely',
+    'slightly', 'somewhat', 'sort of', 'sorta', 'sortof', 'sort-of',
+], B_DECR))
+
+SPECIAL_CASE_IDIOMS = {
+    'the shit': 3,
+    'the bomb': 3,
+    'bad ass': 1.5,
+    'yeah right': -2,
+    'cut the mustard': 2,
+    'kiss of death': -1.5,
+    'hand to mouth': -2,
+}
+
+# Punctuation that is stripped from one end of a word, e.g. 'great!' -> 'great'
+PUNC_LIST = frozenset(['.', '!', '?', ',', ';', ':', '-', "'", '"', '!!', '!!!',
+                       '??', '???', '?!?', '!?!', '?!?!', '!?!?'])
+_PUNCTUATION = string.punctuation
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+# Shared by every scorer that uses the bundled lexicon without changes
+_default_lexicon = None
+
+
+def parse_lexicon(path):
+    """
+    Read a lexicon file of tab separated ``word, mean valence`` lines.
+
+    Columns after the second, as in the original vader_lexicon.txt, are
+    ignored, as are blank lines and lines starting with ``#``.
+
+    Args:
+        path (str): Path of the lexicon file
+
+    Returns:
+        dict: Word -> valence
+    """
+    lexicon = {}
+    with open(path, encoding='utf-8') as lexicon_file:
+        for line in lexicon_file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            word, measure = line.split('\t')[0:2]
+            lexicon[word] = float(measure)
+    return lexicon
+
+
+def save_compiled_lexicon(path, lexicon, source=None):
+    save_marshalled(path, MAGIC, FORMAT_VERSION, {'lexicon': dict(lexicon), 'source': source})
+
+
+def load_compiled_lexicon(path):
+    """
+    Load a lexicon written by ``save_compiled_lexicon``.
+
+    Args:
+        path (str): Path of the compiled lexicon
+
+    Returns:
+        tuple: (word -> valence dict, digest of the file it was compiled from)
+
+    Raises:
+        ValueError: If the file is not a compiled lexicon or was written by another version
+    """
+    payload = load_marshalled(path, MAGIC, FORMAT_VERSION, 'compiled sentiment lexicon')
+    try:
+        return payload['lexicon'], payload['source']
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"'{path}' is corrupted - {e}") from e
+
+
+def compile_default_lexicon(path):
+    """
+    Precompile the bundled lexicon, so that loading it skips parsing the text file.
+
+    Args:
+        path (str): Where to write the compiled lexicon
+    """
+    source_path = get_complete_path_of_file(DEFAULT_LEXICON)
+    save_compiled_lexicon(path, parse_lexicon(source_path), get_file_digest(source_path))
+
+
+def default_lexicon():
+    """
+    Return the bundled lexicon, loading it on first use.
+
+    The precompiled copy written at build time is used when it matches the
+    bundled text file; otherwise the text file is parsed. The returned dict is
+    shared and must not be changed.
+
+    Returns:
+        dict: Word -> valence
+    """
+    global _default_lexicon
+    if _default_lexicon is None:
+        source_path = get_complete_path_of_file(DEFAULT_LEXICON)
+        digest = get_file_digest(source_path)
+        try:
+            lexicon, source = load_compiled_lexicon(get_complete_path_of_file(COMPILED_LEXICON))
+        except (OSError, ValueError):
+            source = None
+        if source != digest:
+            lexicon = parse_lexicon(source_path)
+        _default_lexicon = lexicon
+    return _default_lexicon
+
+
+def vader_words(text):
+    """
+    Split text into words the way VADER does.
+
+    Words are split on whitespace and one-character words are dropped.
+    Punctuation from ``PUNC_LIST`` at one end of a word is stripped, so
+    emoticons such as ``:)`` and contractions are kept.
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        list: The words
+    """
+    words = []
+    for word in text.split():
+        if len(word) < 2:
+            continue
+        core = word.strip(_PUNCTUATION)
+        if core != word and len(core) > 1 and core.translate(_PUNCTUATION_TABLE) == core:
+            if word.startswith(core):
+                if word[len(core):] in PUNC_LIST:
+                    word = core
+            elif word.endswith(core) and word[:-len(core)] in PUNC_LIST:
+                word = core
+        words.append(word)
+    return words
+
+
+def _negated(word):
+    word = word.lower()
+    return word in NEGATE or "n't" in word
+
+
+def _scalar_inc_dec(word, valence, is_cap_diff):
+    # Boost or dampen a valence by the booster word preceding it
+    scalar = BOOSTER_DICT.get(word.lower(), 0.0)
+    if scalar:
+        if valence < 0:
+            scalar *= -1
+        if word.isupper() and is_cap_diff:
+            scalar += C_INCR if valence > 0 else -C_INCR
+    return scalar
+
+
+class LexiconScorer:
+    """
+    Pure Python VADER scorer over a dict lexicon, with no nltk dependency.
+
+    Scores are the same as nltk's ``SentimentIntensityAnalyzer`` with the
+    same lexicon. ``polarity_scores`` can also take the word offsets
+    produced by ``ProfanityFilter.tokenize`` instead of splitting the text
+    again; see ``polarity_scores`` for how that changes the scores.
+    """
+
+    # Tells SentimentAnalyzer that polarity_scores accepts profanity tokens
+    accepts_tokens = True
+
+    def __init__(self, lexicon_path=None, custom_lexicon=None):
+        """
+        Initialize the scorer.
+
+        Args:
+            lexicon_path (str, optional): Lexicon file to use instead of the bundled one
+            custom_lexicon (dict, optional): Words to add to or override in the lexicon
+        """
+        lexicon = parse_lexicon(lexicon_path) if lexicon_path else default_lexicon()
+        # A merged copy, so the shared lexicon never sees the custom words
+        self.lexicon = {**lexicon, **custom_lexicon} if custom_lexicon else lexicon
+
+    def __getstate__(self):
+        # Copies sent to worker processes load the bundled lexicon themselves
+        if self.lexicon is _default_lexicon:
+            return {'lexicon': None}
+        return {'lexicon': self.lexicon}
+
+    def __setstate__(self, state):
+        self.lexicon = state['lexicon'] if state['lexicon'] is not None else default_lexicon()
+
+    def polarity_scores(self, text, tokens=None):
+        """
+        Score the sentiment of text.
+
+        Args:
+            text (str): The text to score
+            tokens (array, optional): Word offsets of ``text`` from ``ProfanityFilter.tokenize``.
+                                      These words contain no punctuation, so emoticons are
+                                      ignored and hyphenated words count as separate words;
+                                      scores of text without either are unchanged.
+
+        Returns:
+            dict: 'neg', 'neu' and 'pos' rounded to 3 decimals, 'compound' rounded to 4
+        """
+        if tokens is None:
+            words = vader_words(text)
+        else:
+            words = []
+            for start, end in zip(tokens[::2], tokens[1::2]):
+                # VADER keeps one-character words with punctuation attached, e.g. 'a!'
+                attached = text[start - 1:start].strip() or text[end:end + 1].strip()
+                if end - start > 1 or attached:
+                    words.append(text[start:end])
+        return self._score_valence(self._valences(words), text)
+
+    def _valences(self, words):
+        lexicon = self.lexicon
+        lowered = [word.lower() for word in words]
+        count = len(words)
+        capitals = sum(1 for word in words if word.isupper())
+        is_cap_diff = 0 < count - capitals < count
+
+        # VADER scores a repeated word using the context of its first occurrence
+        first_index = {}
+        for position, word in enumerate(words):
+            first_index.setdefault(word, position)
+
+        sentiments = []
+        for word in words:
+            i = first_index[word]
+            lower = lowered[i]
+            valence = lexicon.get(lower)
+            if (valence is None or lower in BOOSTER_DICT
+                    or (lower == 'kind' and i < count - 1 and lowered[i + 1] == 'of')):
+                sentiments.append(0)
+                continue
+
+            if word.isupper() and is_cap_diff:
+                valence += C_INCR if valence > 0 else -C_INCR
+            for start_i in range(3):
+                if i > start_i and lowered[i - start_i - 1] not in lexicon:
+                    scalar = _scalar_inc_dec(words[i - start_i - 1], valence, is_cap_diff)
+                    if start_i == 1:
+                        scalar *= 0.95
+                    elif start_i == 2:
+                        scalar *= 0.9
+                    valence = self._never_check(valence + scalar, words, start_i, i)
+                    if start_i == 2:
+                        valence = self._idioms_check(valence, words, i)
+            sentiments.append(self._least_check(valence, lowered, i))
+
+        if 'but' in lowered:
+            but = lowered.index('but')
+            for position, sentiment in enumerate(sentiments):
+                if position < but:
+                    sentiments[position] = sentiment * 0.5
+                elif position > but:
+                    sentiments[position] = sentiment * 1.5
+        return sentiments
+
+    def _never_check(self, valence, words, start_i, i):
+        if start_i == 0:
+            if _negated(words[i - 1]):
+                valence *= N_SCALAR
+        elif start_i == 1:
+            if words[i - 2] == 'never' and words[i - 1] in ('so', 'this'):
+                valence *= 1.5
+            elif _negated(words[i - 2]):
+                valence *= N_SCALAR
+        else:
+            if (words[i - 3] == 'never' and words[i - 2] in ('so', 'this')) or words[i - 1] in ('so', 'this'):
+                valence *= 1.25
+            elif _negated(words[i - 3]):
+                valence *= N_SCALAR
+        return valence
+
+    def _idioms_check(self, valence, words, i):
+        onezero = f'{words[i - 1]} {words[i]}'
+        twoonezero = f'{words[i - 2]} {words[i - 1]} {words[i]}'
+        twoone = f'{words[i - 2]} {words[i - 1]}'
+        threetwoone = f'{words[i - 3]} {words[i - 2]} {words[i - 1]}'
+        threetwo = f'{words[i - 3]} {words[i - 2]}'
+        for sequence in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if sequence in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[sequence]
+                break
+
+        if len(words) - 1 > i:
+            zeroone = f'{words[i]} {words[i + 1]}'
+            if zeroone in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[zeroone]
+        if len(words) - 1 > i + 1:
+            zeroonetwo = f'{words[i]} {words[i + 1]} {words[i + 2]}'
+            if zeroonetwo in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[zeroonetwo]
+
+        if threetwo in BOOSTER_DICT or twoone in BOOSTER_DICT:
+            valence += B_DECR
+        return valence
+
+    def _least_check(self, valence, lowered, i):
+        if i > 0 and lowered[i - 1] == 'least' and 'least' not in self.lexicon:
+            if i == 1 or lowered[i - 2] not in ('at', 'very'):
+                valence *= N_SCALAR
+        return valence
+
+    def _score_valence(self, sentiments, text):
+        if not sentiments:
+            return {'neg': 0.0, 'neu': 0.0, 'pos': 0.0, 'compound': 0.0}
+
+        # Emphasis from up to 4 exclamation marks, and from 2 or more question marks
+        emphasis = min(text.count('!'), 4) * 0.292
+        question_marks = text.count('?')
+        if question_marks > 3:
+            emphasis += 0.96
+        elif question_marks > 1:
+            emphasis += question_marks * 0.18
+
+        total = float(sum(sentiments))
+        if total > 0:
+            total += emphasis
+        elif total < 0:
+            total -= emphasis
+        compound = total / math.sqrt(total * total + 15)
+
+        pos_sum = 0.0
+        neg_sum = 0.0
+        neu_count = 0
+        for sentiment in sentiments:
+            if sentiment > 0:
+                pos_sum += float(sentiment) + 1
+            elif sentiment < 0:
+                neg_sum += float(sentiment) - 1
+            else:
+                neu_count += 1
+        if pos_sum > math.fabs(neg_sum):
+            pos_sum += emphasis
+        elif pos_sum < math.fabs(neg_sum):
+            neg_sum -= emphasis
+
+        total = pos_sum + math.fabs(neg_sum) + neu_count
+        return {
+            'neg': round(math.fabs(neg_sum / total), 3),
+            'neu': round(math.fabs(neu_count / total), 3),
+            'pos': round(math.fabs(pos_sum / total), 3),
+            'compound': round(compound, 4),
+        }
@@ -1,22 +1,65 @@
+import copy
+import threading
+import time
 from collections.abc import Iterable
+from functools import partial
+from .batch import imap_texts
+from .cache import LRUCache
+from .columns import map_distinct
 from .constants import ALLOWED_CHARACTERS
+from .engine import ENGINES, censor_spans, censor_stream, iter_spans, token_pattern, tokenize
 from .utils import (
     any_next_words_form_swear_word,
     get_complete_path_of_file,
+    get_file_digest,
     get_replacement_for_swear_word,
     read_wordlist,
 )
-from .variant import VariantString
-from .sentiment import SentimentAnalyzer
-from .enhancement import TextEnhancer
+from .index import OverlayIndex, WordIndex
+from .pipeline import STAGES, AnalysisContext
+from .prefilter import build_soon, prefilter_for
+from .shared import DeltaIndex, compact
+from .snapshot import load_snapshot, save_snapshot
+from .watch import WordlistWatcher
+
+# Distinguishes a cache miss from cached falsy results such as has_profanity() == False
+_MISSING = object()
+
+
+def _count_false_positive(spans, counts):
+    # A text the prefilter let through is a false positive if the scan finds
+    # nothing; callers that stop early have already seen a span
+    found = False
+    for span in spans:
+        found = True
+        yield span
+    if not found:
+        counts["prefilter_false_positives"] += 1
+
 
 class ProfanityFilter:
     def __init__(self, words=None, enable_sentiment=False, sentiment_options=None,
-                 enable_enhancement=False):
+                 enable_enhancement=False, engine="trie", cache_size=0, cache_max_bytes=None,
+                 metrics=None, prefilter=True):
         if words is not None and not isinstance(words, (str, Iterable)):
             raise TypeError("Words must be of type str, Iterable, or None")
-        
-        self.censor_wordset = []
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+
+        self.engine = engine
+        # Opt-in result cache, cleared whenever the wordset changes
+        self.cache = LRUCache(cache_size, cache_max_bytes) if cache_size else None
+        # Opt-in Metrics; calls skip all instrumentation while this is None
+        self.metrics = metrics
+        # MicroBatcher behind the async methods, created on first use
+        self._batcher = None
+        # Rule out clean texts with one regex search before the full scan
+        self.prefilter = prefilter
+
+        # Updates build a new index and swap it in under this lock; readers
+        # never lock and just use whichever index is current when they start
+        self._update_lock = threading.RLock()
+        self.censor_wordset = WordIndex()
         self.char_map = {
             "a": ("a", "@", "*", "4"),
             "b": ("b", "8"),
@@ -45,175 +88,490 @@ class ProfanityFilter:
             "y": ("y", "j"),
             "z": ("z", "2"),
         }
-        self.max_num_combinations = 1
         self.allowed_characters = ALLOWED_CHARACTERS
         self.default_wordlist_filename = get_complete_path_of_file("wordlist.txt")
+        self.default_snapshot_filename = get_complete_path_of_file("wordlist.snapshot")
+        self._wordlist_digest = None
 
-        if isinstance(words, str):
+        if isinstance(words, WordIndex):
+            self.censor_wordset = words
+            self.char_map = words.char_map
+        elif isinstance(words, str):
             self.load_words_from_file(words)
         else:
             self.load_words(words)
 
+        # Analyzers are imported only when enabled, so censoring alone never loads nltk
         self.enable_sentiment = enable_sentiment
-        sentiment_options = sentiment_options or {}
-        self.sentiment_analyzer = SentimentAnalyzer(**sentiment_options) if enable_sentiment else None
+        self.sentiment_analyzer = None
+        if enable_sentiment:
+            from .sentiment import SentimentAnalyzer
+            self.sentiment_analyzer = SentimentAnalyzer(**(sentiment_options or {}))
+            if self.sentiment_analyzer.metrics is None:
+                self.sentiment_analyzer.metrics = metrics
 
         # Add text enhancer
         self.enable_enhancement = enable_enhancement
-        self.text_enhancer = TextEnhancer() if enable_enhancement else None
+        self.text_enhancer = None
+        if enable_enhancement:
+            from .enhancement import TextEnhancer
+            self.text_enhancer = TextEnhancer(metrics=metrics)
+
+    def __getstate__(self):
+        # Locks cannot be pickled; copies sent to worker processes get their own,
+        # and so do batchers, which hold an event loop and an executor
+        state = self.__dict__.copy()
+        del state["_update_lock"]
+        state["_batcher"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._update_lock = threading.RLock()
+
+    @property
+    def max_num_combinations(self):
+        return self.censor_wordset.max_num_combinations
+
+    @max_num_combinations.setter
+    def max_num_combinations(self, value):
+        with self._update_lock:
+            self._publish(self.censor_wordset.updated(max_num_combinations=value))
 
+    def censor_text(self, text, censor_char="*"):
+        if self.metrics is None:
+            return self._censor_text(text, censor_char)
+        with self.metrics.measure("censor_text", text) as counts:
+            return self._censor_text(text, censor_char, counts)
 
+    def _censor_text(self, text, censor_char, counts=None):
+        if not self.censor_wordset:
+            self.load_words()
+        key = ("censor_text", self.censor_wordset.generation, text, censor_char)
+        return self._cached(key, self._replace_swear_words, text, censor_char, None, counts)
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else None
+
+    def clear_cache(self):
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _cached(self, key, compute, *args):
+        if self.cache is None:
+            return compute(*args)
+        result = self.cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = compute(*args)
+            self.cache.put(key, result)
+        return result
 
-    def censor_text(self, text, censor_char="*"):
+    def censor_stream(self, source, censor_char="*", chunk_size=65536):
         if not self.censor_wordset:
             self.load_words()
-        return self._replace_swear_words(text, censor_char)
+        if isinstance(source, str):
+            chunks = (source,)
+        elif hasattr(source, "read"):
+            chunks = iter(partial(source.read, chunk_size), "")
+        else:
+            chunks = source
+        if self.engine == "legacy":
+            return self._censor_joined(chunks, censor_char)
+        index = self.censor_wordset
+        return censor_stream(chunks, index, token_pattern(self.allowed_characters),
+                             index.max_num_combinations, get_replacement_for_swear_word(censor_char))
+
+    def _censor_joined(self, chunks, censor_char):
+        # The legacy matcher has no incremental form, so the whole input is
+        # read and censored in one piece to give what censor_text would
+        yield self._replace_swear_words("".join(chunks), censor_char)
 
     def load_words_from_file(self, filename, **kwargs):
         words = list(read_wordlist(filename))
         self._add_words_to_wordset(words, **kwargs)
 
     def load_words(self, custom_words=None, **kwargs):
-        custom_words = list(custom_words) if custom_words else list(read_wordlist(self.default_wordlist_filename))
-        self._add_words_to_wordset(custom_words, **kwargs)
+        if custom_words:
+            self._add_words_to_wordset(list(custom_words), **kwargs)
+            return
+
+        digest = get_file_digest(self.default_wordlist_filename)
+        if kwargs or not self._load_default_snapshot(digest):
+            self._add_words_to_wordset(list(read_wordlist(self.default_wordlist_filename)), **kwargs)
+        if not kwargs:
+            self._wordlist_digest = digest
+
+    def save_compiled(self, path, mapped=False):
+        if not self.censor_wordset:
+            self.load_words()
+        if mapped:
+            from .shared import save_index
+            save_index(path, self.censor_wordset)
+        else:
+            save_snapshot(path, self.censor_wordset, source=self._wordlist_digest)
+
+    @classmethod
+    def load_compiled(cls, path, **kwargs):
+        from .shared import MAGIC, map_index
+
+        with open(path, "rb") as compiled_file:
+            mapped = compiled_file.read(len(MAGIC)) == MAGIC
+        if mapped:
+            return cls(words=map_index(path), **kwargs)
+        index, _ = load_snapshot(path)
+        return cls(words=index, **kwargs)
+
+    def share_compiled(self, name=None):
+        from .shared import share_index
+
+        if not self.censor_wordset:
+            self.load_words()
+        return share_index(self.censor_wordset, name)
+
+    @classmethod
+    def attach_compiled(cls, name, **kwargs):
+        from .shared import attach_index
+
+        return cls(words=attach_index(name), **kwargs)
+
+    def _load_default_snapshot(self, digest):
+        # The snapshot generated at build time is only valid for the default
+        # wordlist, char_map and allowed characters it was compiled from.
+        if self.allowed_characters is not ALLOWED_CHARACTERS:
+            return False
+        try:
+            index, source = load_snapshot(self.default_snapshot_filename)
+        except (OSError, ValueError):
+            return False
+        if source != digest or index.char_map != self.char_map:
+            return False
+
+        index.char_map = self.char_map
+        with self._update_lock:
+            index.max_num_combinations = max(self.max_num_combinations, index.max_num_combinations)
+            self._publish(index)
+        return True
 
     def add_custom_words(self, custom_words):
         if not isinstance(custom_words, (list, tuple, set)):
             raise TypeError("Function 'add_custom_words' only accepts list, tuple, or set.")
-        for word in custom_words:
-            self.censor_wordset.append(VariantString(word, char_map=self.char_map))
+        self._update_wordset(add=custom_words)
+
+    def remove_words(self, words):
+        if not isinstance(words, (list, tuple, set)):
+            raise TypeError("Function 'remove_words' only accepts list, tuple, or set.")
+        removed = set()
+        for word in words:
+            removed.add(str(word))
+            removed.add(str(word).lower())
+        self._update_wordset(remove=removed)
+
+    def reload_from_file(self, filename=None, **kwargs):
+        words = set(self._prepare_words(read_wordlist(filename or self.default_wordlist_filename), **kwargs))
+        with self._update_lock:
+            current = set(self.censor_wordset.words())
+            self._update_wordset(add=words - current, remove=current - words)
+
+    def watch(self, filename=None, interval=1.0, **kwargs):
+        return WordlistWatcher(self, filename or self.default_wordlist_filename, interval, **kwargs).start()
+
+    def overlay(self, custom_words=(), whitelist_words=()):
+        if not isinstance(custom_words, (list, tuple, set)):
+            raise TypeError("Function 'overlay' only accepts list, tuple, or set.")
+        if not self.censor_wordset:
+            self.load_words()
+        words = self._prepare_words(custom_words, whitelist_words)
+        allowed = set(word.lower() for word in whitelist_words)
+        max_num_combinations = max([1] + [self._count_non_allowed_characters(word) for word in words])
+
+        # The tenant filter shares everything but its index, lock and cache
+        tenant = copy.copy(self)
+        if self.cache is not None:
+            tenant.cache = LRUCache(self.cache.max_entries, self.cache.max_bytes)
+        tenant._publish(OverlayIndex(self.censor_wordset, words, allowed, max_num_combinations))
+        return tenant
+
+    def rebase(self, base):
+        if not isinstance(self.censor_wordset, OverlayIndex) or isinstance(self.censor_wordset, DeltaIndex):
+            raise TypeError("Only filters created with overlay() can be rebased")
+        if isinstance(base, ProfanityFilter):
+            base = base.censor_wordset
+        with self._update_lock:
+            self._publish(self.censor_wordset.rebased(base))
+
+    def _update_wordset(self, add=(), remove=()):
+        with self._update_lock:
+            index = self.censor_wordset
+            if index.char_map is not self.char_map:
+                # char_map was replaced since the index was compiled
+                index = WordIndex(index.words(), char_map=self.char_map,
+                                  max_num_combinations=index.max_num_combinations)
+            add = [str(word) for word in add]
+            max_num_combinations = max([index.max_num_combinations] +
+                                       [self._count_non_allowed_characters(word) for word in add])
+            self._publish(index.updated(add, remove, max_num_combinations))
+
+    def _publish(self, index):
+        # A single attribute assignment, so a reader sees either the old index
+        # or the new one. Cache keys carry the index generation, so results
+        # computed from the old index are never served for the new one.
+        # Wordlists are kept flat, which takes far less memory than the trie
+        # they are built in.
+        index = compact(index)
+        previous = self.censor_wordset
+        self.censor_wordset = index
+        if self.prefilter and previous is not None:
+            # A filter busy enough to have a prefilter gets one for the new
+            # index in the background rather than after BUILD_AFTER more texts
+            build_soon(index, self.allowed_characters, previous)
+        self._wordlist_digest = None
+        self.clear_cache()
 
     def has_profanity(self, text):
-        return text != self.censor_text(text)
+        if self.metrics is None:
+            return self._cached(("has_profanity", self.censor_wordset.generation, text), self._has_profanity, text)
+        with self.metrics.measure("has_profanity", text) as counts:
+            key = ("has_profanity", self.censor_wordset.generation, text)
+            return self._cached(key, self._has_profanity, text, counts)
 
-    def _add_words_to_wordset(self, words, whitelist_words=None):
-        if whitelist_words is not None and not isinstance(whitelist_words, (list, set, tuple)):
-            raise TypeError("The 'whitelist_words' keyword argument only accepts list, tuple, or set.")
-        
-        whitelist_words = set(word.lower() for word in (whitelist_words or []))
-        all_censor_words = []
+    def _has_profanity(self, text, counts=None):
+        if self.engine == "legacy":
+            return text != self._censor_text(text, "*", counts)
+        return next(self._iter_spans(text, None, counts), None) is not None
 
-        for word in set(words):
-            word = word.lower()
-            if word in whitelist_words:
-                continue
+    def count_profanity(self, text):
+        return sum(1 for _ in self._iter_spans(text))
 
-            num_of_non_allowed_chars = self._count_non_allowed_characters(word)
-            if num_of_non_allowed_chars > self.max_num_combinations:
-                self.max_num_combinations = num_of_non_allowed_chars
+    def iter_matches(self, text):
+        for start, end, entry in self._iter_spans(text):
+            yield start, end, text[start:end], entry
 
-            all_censor_words.append(VariantString(word, char_map=self.char_map))
+    def first_match(self, text):
+        span = next(self._iter_spans(text), None)
+        return text[span[0]:span[1]] if span is not None else None
 
-        self.censor_wordset = all_censor_words
+    def censor_many(self, texts, censor_char="*", workers=None, chunksize=64):
+        if not self.censor_wordset:
+            self.load_words()
+        return list(imap_texts(self, "censor_text", texts, workers, chunksize, censor_char=censor_char))
 
-    def _count_non_allowed_characters(self, word):
-        return sum(1 for char in word if char not in self.allowed_characters)
+    def has_profanity_many(self, texts, workers=None, chunksize=64):
+        if not self.censor_wordset:
+            self.load_words()
+        return list(imap_texts(self, "has_profanity", texts, workers, chunksize))
 
-    def _update_next_word_indices(self, text, word_indices, start_idx):
-        if not word_indices:
-            return self._get_upcoming_words(text, start_idx, self.max_num_combinations)
-        else:
-            word_indices = word_indices[2:]
-            if word_indices and word_indices[-1][0] != "":
-                word_indices += self._get_upcoming_words(text, word_indices[-1][1], 1)
-        return word_indices
+    def censor_array(self, values, censor_char="*", workers=None, chunksize=64):
+        """Censor a column of texts, scanning each distinct text once.
 
-    def _replace_swear_words(self, text, censor_char):
-        censored_text = []
-        cur_word = []
-        skip_index = -1
-        next_word_indices = []
-        start_idx = self._find_start_index_of_next_word(text, 0)
+        Takes a list, NumPy array, pandas Series or pyarrow array and returns
+        one of the same kind; missing values are passed through.
+        """
+        return map_distinct(values, lambda texts: self.censor_many(texts, censor_char, workers, chunksize))
 
-        if start_idx >= len(text) - 1:
-            return text
+    def has_profanity_array(self, values, workers=None, chunksize=64):
+        """Return a boolean mask over a column of texts, False where a value is missing."""
+        return map_distinct(values, lambda texts: self.has_profanity_many(texts, workers, chunksize), boolean=True)
 
-        censored_text.append(text[:start_idx])
-        text = text[start_idx:]
+    def configure_async(self, executor=None, max_batch_size=64, max_wait=0.002):
+        """Set how the async methods batch and where they run, see MicroBatcher."""
+        from .aio import MicroBatcher
 
-        for index, char in enumerate(text):
-            if index < skip_index:
-                continue
-            if char in self.allowed_characters:
-                cur_word.append(char)
-                continue
+        self._batcher = MicroBatcher(executor, max_batch_size, max_wait)
+        return self._batcher
 
-            if not cur_word:
-                censored_text.append(char)
-                continue
+    def _async_batcher(self):
+        # Loaded here rather than by the first batch, from an executor thread
+        if not self.censor_wordset:
+            self.load_words()
+        if self._batcher is None:
+            self.configure_async()
+        return self._batcher
 
-            next_word_indices = self._update_next_word_indices(text, next_word_indices, index)
-            contains_swear_word, end_index = any_next_words_form_swear_word(
-                "".join(cur_word), next_word_indices, self.censor_wordset
-            )
-            if contains_swear_word:
-                cur_word = [get_replacement_for_swear_word(censor_char)]
-                skip_index = end_index
-                next_word_indices = []
-
-            if "".join(cur_word).lower() in self.censor_wordset:
-                cur_word = [get_replacement_for_swear_word(censor_char)]
-
-            censored_text.extend(cur_word)
-            censored_text.append(char)
-            cur_word = []
-
-        if cur_word and skip_index < len(text) - 1:
-            if "".join(cur_word).lower() in self.censor_wordset:
-                cur_word = [get_replacement_for_swear_word(censor_char)]
-            censored_text.extend(cur_word)
-        
-        return "".join(censored_text)
+    async def acensor_text(self, text, censor_char="*"):
+        return await self._async_batcher().submit(self, "censor_text", text, censor_char=censor_char)
 
-    def _find_start_index_of_next_word(self, text, start_idx):
-        for index in range(start_idx, len(text)):
-            if text[index] in self.allowed_characters:
-                return index
-        return len(text)
-
-    def _get_next_word_and_end_index(self, text, start_idx):
-        next_word = []
-        for index in range(start_idx, len(text)):
-            if text[index] in self.allowed_characters:
-                next_word.append(text[index])
-            else:
-                break
-        return "".join(next_word), index
-
-    def _get_upcoming_words(self, text, start_idx, num_of_next_words=1):
-        start_idx_of_next_word = self._find_start_index_of_next_word(text, start_idx)
-        if start_idx_of_next_word >= len(text) - 1:
-            return [("", start_idx_of_next_word), ("", start_idx_of_next_word)]
-
-        next_word, end_index = self._get_next_word_and_end_index(text, start_idx_of_next_word)
-        words = [(next_word, end_index), (text[start_idx:start_idx_of_next_word] + next_word, end_index)]
-
-        if num_of_next_words > 1:
-            words.extend(self._get_upcoming_words(text, end_index, num_of_next_words - 1))
-
-        return words
-
-    def analyze_text(self, text, censor_char="*", detailed=False):
-        censored = self.censor_text(text, censor_char)
-        contains_profanity = censored != text
-
-        result = {
-            'censored_text': censored,
-            'contains_profanity': contains_profanity
-        }
+    async def ahas_profanity(self, text):
+        return await self._async_batcher().submit(self, "has_profanity", text)
+
+    async def aanalyze_text(self, text, censor_char="*", detailed=False, stages=None):
+        # Normalized here so that calls asking for the same stages share batches
+        stages = self._analysis_stages(stages)
+        return await self._async_batcher().submit(self, "analyze_text", text, censor_char=censor_char,
+                                                  detailed=detailed, stages=stages)
 
-        # Add sentiment analysis if enabled
-        if self.enable_sentiment and self.sentiment_analyzer:
-            if detailed:
-                result['sentiment'] = self.sentiment_analyzer.get_detailed_analysis(text)
-            else:
-                result['sentiment'] = {
-                    'classification': self.sentiment_analyzer.get_sentiment(text),
-                    'scores': self.sentiment_analyzer.analyze(text)
-                }
+    def _add_words_to_wordset(self, words, whitelist_words=None):
+        all_censor_words = self._prepare_words(words, whitelist_words)
+        with self._update_lock:
+            max_num_combinations = max([self.max_num_combinations] +
+                                       [self._count_non_allowed_characters(word) for word in all_censor_words])
+            self._publish(WordIndex(all_censor_words, char_map=self.char_map,
+                                    max_num_combinations=max_num_combinations))
+
+    def _prepare_words(self, words, whitelist_words=None):
+        if whitelist_words is not None and not isinstance(whitelist_words, (list, set, tuple)):
+            raise TypeError("The 'whitelist_words' keyword argument only accepts list, tuple, or set.")
 
-        # Add enhancement suggestions if enabled
-        if self.enable_enhancement and self.text_enhancer:
-            result['enhancement_suggestions'] = self.text_enhancer.suggest_improvements(text)
+        whitelist_words = set(word.lower() for word in (whitelist_words or []))
+        return [word for word in set(word.lower() for word in words) if word not in whitelist_words]
 
+    def _count_non_allowed_characters(self, word):
+        return sum(1 for char in word if char not in self.allowed_characters)
+
+    def tokenize(self, text):
+        return tokenize(text, token_pattern(self.allowed_characters))
+
+    def _iter_spans(self, text, tokens=None, counts=None):
+        if not self.censor_wordset:
+            self.load_words()
+        index = self.censor_wordset
+        spans = iter_spans(text, index, token_pattern(self.allowed_characters),
+                           index.max_num_combinations, tokens, counts)
+        if not self.prefilter:
+            return spans
+        prefilter = prefilter_for(index, self.allowed_characters)
+        if prefilter is None:
+            return spans
+        if not prefilter.may_match(text):
+            if counts is not None:
+                counts["prefilter_skips"] += 1
+            return iter(())
+        return spans if counts is None else _count_false_positive(spans, counts)
+
+    def _replace_swear_words(self, text, censor_char, tokens=None, counts=None):
+        if self.engine == "legacy":
+            if tokens is None:
+                tokens = self.tokenize(text)
+            elif callable(tokens):
+                tokens = tokens()
+            if counts is not None:
+                # The legacy engine only reports how many words it scanned
+                counts["tokens"] += len(tokens) // 2
+            return self._replace_swear_words_legacy(text, censor_char, tokens)
+        return censor_spans(text, self._iter_spans(text, tokens, counts), get_replacement_for_swear_word(censor_char))
+
+    def _replace_swear_words_legacy(self, text, censor_char, tokens):
+        count = len(tokens) // 2
+        if not count or tokens[0] >= len(text) - 1:
+            return text
+
+        index = self.censor_wordset
+        replacement = get_replacement_for_swear_word(censor_char)
+        # The words after the current one that are looked ahead to, as the
+        # original sliding window chose them: up to max_num_combinations words
+        # when the window is refilled, then one word dropped and one added per
+        # word. A window that runs empty is only refilled at the next word, so
+        # with max_num_combinations == 1 every other word gets no lookahead.
+        # window_end is the last word in the window, or None while it is empty;
+        # no_more is the first position that is never looked ahead to.
+        no_more = count - 1 if tokens[2 * count - 2] >= len(text) - 1 else count
+        window_end = None
+        censored_text = []
+        position = 0
+        word_position = 0
+        while word_position < count:
+            start, end = tokens[2 * word_position], tokens[2 * word_position + 1]
+            censored_text.append(text[position:start])
+            word = text[start:end]
+            position = end
+
+            if end < len(text):
+                if window_end is None:
+                    window_end = min(word_position + index.max_num_combinations, no_more)
+                elif window_end <= word_position:
+                    window_end = None
+                elif window_end < no_more:
+                    window_end += 1
+                contains_swear_word = False
+                if window_end is not None:
+                    contains_swear_word, last_position = any_next_words_form_swear_word(
+                        text, tokens, word_position, window_end - word_position, index
+                    )
+                if contains_swear_word:
+                    window_end = None
+                    # The separator after the first word is kept and the rest of
+                    # the phrase is dropped. A phrase that runs to the end of the
+                    # text drops everything after that separator.
+                    censored_text.append(replacement + text[end])
+                    position = tokens[2 * last_position + 1]
+                    if position == len(text):
+                        return "".join(censored_text)
+                    word_position = last_position + 1
+                    continue
+
+            censored_text.append(replacement if word.lower() in index else word)
+            word_position += 1
+
+        censored_text.append(text[position:])
+        return "".join(censored_text)
+
+    def analyze_text(self, text, censor_char="*", detailed=False, stages=None):
+        stages = self._analysis_stages(stages)
+        if self.metrics is None:
+            return self._cached_analysis(text, censor_char, detailed, stages)
+        with self.metrics.measure("analyze_text", text) as counts:
+            return self._cached_analysis(text, censor_char, detailed, stages, counts)
+
+    def _cached_analysis(self, text, censor_char, detailed, stages, counts=None):
+        if self.cache is None:
+            return self._analyze_text(text, censor_char, detailed, stages, counts)
+        # Results are mutable dicts, so callers get a copy of the cached one
+        key = ("analyze_text", self.censor_wordset.generation, text, censor_char, detailed, stages)
+        result = self._cached(key, self._analyze_text, text, censor_char, detailed, stages, counts)
+        return copy.deepcopy(result)
+
+    def _analysis_stages(self, stages):
+        if stages is None:
+            # Every stage this filter was configured for
+            return tuple(stage for stage, enabled in zip(STAGES, (
+                True,
+                self.enable_sentiment and self.sentiment_analyzer is not None,
+                self.enable_enhancement and self.text_enhancer is not None,
+            )) if enabled)
+
+        stages = set(stages)
+        unknown = stages.difference(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown analysis stages {sorted(unknown)}, expected some of {', '.join(STAGES)}")
+        if "sentiment" in stages and self.sentiment_analyzer is None:
+            raise ValueError("The sentiment stage needs a filter created with enable_sentiment=True")
+        if "enhancement" in stages and self.text_enhancer is None:
+            raise ValueError("The enhancement stage needs a filter created with enable_enhancement=True")
+        return tuple(stage for stage in STAGES if stage in stages)
+
+    def _analyze_text(self, text, censor_char, detailed, stages, counts=None):
+        # Every stage reads from one context, so intermediate results such as
+        # the tokens or the sentiment scores are computed at most once
+        context = AnalysisContext(self, text, counts)
+        result = {}
+        for stage in stages:
+            run_stage = getattr(self, f"_{stage}_stage")
+            if self.metrics is None:
+                run_stage(context, result, censor_char=censor_char, detailed=detailed)
+                continue
+            start = time.perf_counter()
+            run_stage(context, result, censor_char=censor_char, detailed=detailed)
+            self.metrics.record(f"analyze_text.{stage}", time.perf_counter() - start)
         return result
+
+    def _censor_stage(self, context, result, censor_char, **options):
+        if not self.censor_wordset:
+            self.load_words()
+        # Tokens are passed lazily: a text the prefilter rules out is never
+        # tokenized, unless a later stage needs the tokens itself
+        censored = self._replace_swear_words(context.text, censor_char, lambda: context.tokens, context.counts)
+        result['censored_text'] = censored
+        result['contains_profanity'] = censored != context.text
+
+    def _sentiment_stage(self, context, result, detailed, **options):
+        if detailed:
+            result['sentiment'] = self.sentiment_analyzer.get_detailed_analysis(context.text, context.scores)
+        else:
+            result['sentiment'] = {
+                'classification': self.sentiment_analyzer.classify(context.scores),
+                'scores': context.scores
+            }
+
+    def _enhancement_stage(self, context, result, **options):
+        # Timed as a stage already, so the enhancer does not record it again
+        result['enhancement_suggestions'] = self.text_enhancer.suggest_improvements(context.text, context.lowered,
+                                                                                    record_metrics=False)
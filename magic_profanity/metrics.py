@@ -0,0 +1,139 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+
+# Counters recorded by ProfanityFilter, with their Prometheus help text
+COUNTERS = {
+    "texts": "Texts processed",
+    "characters": "Characters of text scanned",
+    "tokens": "Words found by tokenization",
+    "lookups": "Wordlist lookups, one per word or phrase tried against the index",
+    "trie_steps": "Trie nodes expanded during lookups",
+    "lookaheads": "Lookups that tried to join a word with the words following it",
+    "matches": "Censored spans found",
+    "prefilter_skips": "Texts the prefilter ruled out without a full scan",
+    "prefilter_false_positives": "Texts the prefilter let through that had no profanity",
+}
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                   0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        # (upper bound, observations at or below it) pairs, ending with +Inf
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class Metrics:
+    """Opt-in counters and latency histograms for a filter and its analyzers.
+
+    Pass one to ``ProfanityFilter(metrics=...)``. Every instrumented call
+    records its latency under an operation name, e.g. ``censor_text`` or
+    ``analyze_text.sentiment`` for a stage, and the filter adds the work it
+    did to the counters in ``COUNTERS``. ``callback``, if given, is called as
+    ``callback(operation, seconds, counts)`` after every recorded operation,
+    which makes it possible to attach the counts of one slow call to a trace.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, callback=None):
+        self.buckets = tuple(sorted(buckets))
+        self.callback = callback
+        self._lock = Lock()
+        self.reset()
+
+    def __getstate__(self):
+        # Locks cannot be pickled, and callbacks often cannot; a copy starts empty
+        return {"buckets": self.buckets}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def reset(self):
+        with self._lock:
+            self.counters = dict.fromkeys(COUNTERS, 0)
+            self.timings = {}
+
+    def record(self, operation, seconds, counts=None):
+        with self._lock:
+            if counts:
+                for name, value in counts.items():
+                    self.counters[name] = self.counters.get(name, 0) + value
+            histogram = self.timings.get(operation)
+            if histogram is None:
+                histogram = self.timings[operation] = Histogram(self.buckets)
+            histogram.observe(seconds)
+        if self.callback is not None:
+            self.callback(operation, seconds, dict(counts) if counts else {})
+
+    @contextmanager
+    def measure(self, operation, text=None):
+        """Time the block and record it as ``operation``.
+
+        Yields the dict of counts to record along with the time. With a
+        ``text``, it starts out counting one text of ``len(text)`` characters.
+        """
+        counts = dict.fromkeys(COUNTERS, 0)
+        if text is not None:
+            counts["texts"] = 1
+            counts["characters"] = len(text)
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            self.record(operation, time.perf_counter() - start, counts)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "timings": {
+                    operation: {
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "mean": histogram.sum / histogram.count,
+                        "buckets": histogram.cumulative(),
+                    }
+                    for operation, histogram in self.timings.items()
+                },
+            }
+
+    def to_prometheus(self, prefix="magic_profanity"):
+        """Return the metrics in the Prometheus text exposition format."""
+        stats = self.stats()
+        lines = []
+        for name, value in stats["counters"].items():
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# HELP {metric} {COUNTERS.get(name, name)}.")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+
+        metric = f"{prefix}_operation_seconds"
+        lines.append(f"# HELP {metric} Time spent per operation and analysis stage.")
+        lines.append(f"# TYPE {metric} histogram")
+        for operation, timing in sorted(stats["timings"].items()):
+            label = f'operation="{operation}"'
+            for bound, count in timing["buckets"]:
+                bound = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f"{metric}_sum{{{label}}} {timing['sum']!r}")
+            lines.append(f"{metric}_count{{{label}}} {timing['count']}")
+        return "\n".join(lines) + "\n"
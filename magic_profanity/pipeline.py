@@ -0,0 +1,39 @@
+from functools import cached_property
+
+# Stages of ProfanityFilter.analyze_text, in the order they run
+STAGES = ("censor", "sentiment", "enhancement")
+
+
+class AnalysisContext:
+    """State shared by the stages of one ``analyze_text`` call.
+
+    Every field is computed the first time a stage asks for it and reused by
+    the stages after it, so no stage repeats work another one already did.
+    """
+
+    def __init__(self, profanity_filter, text, counts=None):
+        self.profanity_filter = profanity_filter
+        self.text = text
+        # Metrics counters of the call, if the filter records metrics
+        self.counts = counts
+
+    @cached_property
+    def tokens(self):
+        return self.profanity_filter.tokenize(self.text)
+
+    @cached_property
+    def lowered(self):
+        return self.text.lower()
+
+    @cached_property
+    def preprocessed(self):
+        return self.profanity_filter.sentiment_analyzer.preprocess(self.text)
+
+    @cached_property
+    def scores(self):
+        analyzer = self.profanity_filter.sentiment_analyzer
+        # The tokens hold offsets into the original text, so they only carry
+        # over when preprocessing left it unchanged
+        if analyzer.accepts_tokens and self.preprocessed == self.text:
+            return analyzer.score(self.preprocessed, self.tokens)
+        return analyzer.score(self.preprocessed)
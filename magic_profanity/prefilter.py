@@ -0,0 +1,193 @@
+import re
+import threading
+import weakref
+
+from .engine import char_class
+from .index import OverlayIndex
+
+# Characters of a text the prefilter looks at from the start of each word.
+# Deeper signatures reject more texts but take longer to compile.
+DEPTH = 5
+# Texts an index scans before its prefilter is compiled. Compiling costs
+# about as much as scanning a few hundred texts, so wordlists that are
+# replaced or updated before then never pay for it.
+BUILD_AFTER = 256
+
+# Index -> [allowed characters, their count, texts scanned or None once the
+# build started, Prefilter or None, build thread or None]
+_prefilters = weakref.WeakKeyDictionary()
+# Index -> (allowed characters, their count, compiled patterns)
+_patterns = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def prefilter_for(index, allowed_characters):
+    """Return the Prefilter for ``index``, or None until it is compiled.
+
+    Compiling takes a hundred milliseconds or so, which no call should wait
+    for: it starts on a background thread once ``index`` has scanned
+    ``BUILD_AFTER`` texts, and the prefilter is used as soon as it is done.
+    """
+    entry = _prefilters.get(index)
+    if entry is None or entry[0] is not allowed_characters or entry[1] != len(allowed_characters):
+        with _lock:
+            entry = _prefilters[index] = [allowed_characters, len(allowed_characters), 0, None, None]
+    if entry[2] is not None:
+        with _lock:
+            if entry[2] is not None:
+                entry[2] += 1
+                if entry[2] >= BUILD_AFTER:
+                    _start_build(entry, index)
+    return entry[3]
+
+
+def build_soon(index, allowed_characters, previous=None):
+    """Start compiling the Prefilter for ``index`` without waiting for ``BUILD_AFTER`` texts.
+
+    With ``previous``, only if the prefilter of that index was compiled or
+    being compiled, so an index that replaces a busy one is ready sooner.
+    """
+    if previous is not None:
+        entry = _prefilters.get(previous)
+        if entry is None or entry[2] is not None:
+            return
+    with _lock:
+        entry = _prefilters.get(index)
+        if entry is None or entry[0] is not allowed_characters or entry[1] != len(allowed_characters):
+            entry = _prefilters[index] = [allowed_characters, len(allowed_characters), 0, None, None]
+        if entry[2] is not None:
+            _start_build(entry, index)
+
+
+def _start_build(entry, index):
+    # Called with _lock held; the thread holds the index only until it is done
+    def build():
+        entry[3] = Prefilter(index, entry[0])
+
+    entry[2] = None
+    entry[4] = threading.Thread(target=build, name="PrefilterBuild", daemon=True)
+    entry[4].start()
+
+
+def _compiled(index, allowed_characters):
+    # An overlay can only match the words of its base and its own added
+    # words, so tenants reuse the patterns of the base they share
+    if isinstance(index, OverlayIndex):
+        patterns = _compiled(index.base, allowed_characters)
+        if len(index._extra):
+            patterns = patterns + _compiled(index._extra, allowed_characters)
+        return patterns
+    cached = _patterns.get(index)
+    if cached is None or cached[0] is not allowed_characters or cached[1] != len(allowed_characters):
+        pattern = re.compile(_signature(index, allowed_characters, DEPTH))
+        cached = _patterns[index] = (allowed_characters, len(allowed_characters), (pattern,))
+    return cached[2]
+
+
+class Prefilter:
+    """Cheap test that rules out most texts the full matcher would not censor.
+
+    A span always starts at a word and spells a wordlist entry with the
+    ``char_map`` substitutions, either through the following text as it is or
+    through the following words with the separators left out. The first
+    ``DEPTH`` characters of every such spelling are compiled into a single
+    regex anchored at word starts, which may skip separators anywhere, so it
+    finds a superset of the places where a span could start. Whenever
+    ``may_match`` returns False, the full matcher would find nothing.
+
+    Only ASCII texts are searched: for them, lowercasing is the same one
+    character at a time, which the character classes mirror. Other texts
+    always count as possible matches.
+    """
+
+    def __init__(self, index, allowed_characters):
+        self.patterns = _compiled(index, allowed_characters)
+        self._searches = [pattern.search for pattern in self.patterns]
+
+    def may_match(self, text):
+        if not text.isascii():
+            return True
+        for search in self._searches:
+            if search(text) is not None:
+                return True
+        return False
+
+    def false_positive_rate(self, clean_texts):
+        """Return the share of ``clean_texts``, texts without profanity, that get through."""
+        clean_texts = list(clean_texts)
+        if not clean_texts:
+            return 0.0
+        return sum(1 for text in clean_texts if self.may_match(text)) / len(clean_texts)
+
+
+def _signature(index, allowed_characters, depth):
+    allowed = {char for char in allowed_characters if char.isascii()}
+    if not allowed:
+        return "(?!)"
+    # Word prefixes up to ``depth`` characters; a piece is at least one
+    # character long, so no spelling within ``depth`` goes deeper
+    trie = {}
+    for word in index.words():
+        node = trie
+        for char in word[:depth]:
+            node = node.setdefault(char, {})
+        if len(word) <= depth:
+            node[""] = None
+
+    pieces = {}
+
+    def spellings(char):
+        # ASCII pieces of lowercased text that can stand for ``char``
+        if char not in pieces:
+            pieces[char] = [piece for piece in (char, *index._reverse)
+                            if piece.isascii() and char in index._candidates(piece)]
+        return pieces[char]
+
+    def cased(char):
+        # ASCII characters that lowercase to ``char``
+        return {variant for variant in (char, char.upper()) if variant.isascii() and variant.lower() == char}
+
+    skip = "[^" + char_class(allowed)[1:-1] + "]*"
+    memo = {}
+
+    def expression(node, remaining):
+        # Regex for the spellings of the words below ``node``, cut off after
+        # ``remaining`` more characters; None if nothing can be spelled
+        key = (id(node), remaining)
+        if key in memo:
+            return memo[key]
+        if "" in node or remaining <= 0:
+            memo[key] = ""
+            return ""
+        classes = {}
+        sequences = []
+        for char, child in node.items():
+            if char == "":
+                continue
+            for piece in spellings(char):
+                rest = expression(child, remaining - len(piece))
+                if rest is None:
+                    continue
+                steps = [cased(piece_char) for piece_char in piece[:remaining]]
+                if not all(steps):
+                    continue
+                if len(steps) == 1:
+                    classes.setdefault(rest if len(piece) <= remaining else "", set()).update(steps[0])
+                else:
+                    sequences.append(skip.join(char_class(step) for step in steps)
+                                     + (skip + rest if rest and len(piece) < remaining else ""))
+        branches = [char_class(chars) + (skip + rest if rest else "") for rest, chars in classes.items()]
+        branches.extend(sequences)
+        if not branches:
+            memo[key] = None
+        elif len(branches) == 1:
+            memo[key] = branches[0]
+        else:
+            memo[key] = "(?:" + "|".join(sorted(branches)) + ")"
+        return memo[key]
+
+    body = expression(trie, depth)
+    if body is None:
+        return "(?!)"
+    start = char_class(allowed)
+    return "(?<!" + start + ")(?=" + start + ")" + body
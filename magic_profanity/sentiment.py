@@ -1,11 +1,155 @@
 # magic_profanity/sentiment.py
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import os
 import re
 
+from .batch import imap_texts
+from .cache import LRUCache
+
+# Environment variable pointing at a local copy of vader_lexicon.txt
+LEXICON_PATH_ENV = 'MAGIC_PROFANITY_VADER_LEXICON'
+
+# Built-in scoring backends: nltk's VADER, or the bundled nltk-free LexiconScorer
+BACKENDS = ('vader', 'lexicon')
+
+# A pattern of the form \b(word|word|...)\b, which matches exactly those words
+_WORD_ALTERNATION = re.compile(r'\\b\((\w+(?:\|\w+)*)\)\\b$')
+_WORD_CHAR = re.compile(r'\w')
+
+# Simple emotion detection dictionary
+EMOTION_PATTERNS = {
+    'joy': [r'\b(happy|joy|delighted|excited|love|wonderful|great)\b', r'😊|😄|😃|😁|😀'],
+    'anger': [r'\b(angry|mad|furious|outraged|annoyed)\b', r'😠|😡|🤬'],
+    'sadness': [r'\b(sad|unhappy|depressed|miserable|upset)\b', r'😢|😭|😔|☹️'],
+    'fear': [r'\b(afraid|scared|terrified|worried|anxious)\b', r'😨|😰|😱'],
+    'surprise': [r'\b(surprised|shocked|amazed|astonished)\b', r'😲|😮|😯'],
+    'disgust': [r'\b(disgusted|gross|yuck|ew)\b', r'🤢|🤮']
+}
+
+
+def load_vader(lexicon_path=None, auto_download=True):
+    """
+    Create a VADER analyzer, importing nltk only when it is first needed.
+
+    Args:
+        lexicon_path (str, optional): Path to a local vader_lexicon.txt to use instead of nltk data
+        auto_download (bool): Whether to download the lexicon when nltk data does not contain it
+
+    Returns:
+        SentimentIntensityAnalyzer: The VADER analyzer
+
+    Raises:
+        LookupError: If no lexicon is available and it could not be downloaded
+    """
+    import nltk
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+
+    if lexicon_path:
+        # nltk.data.load refuses paths outside its data directories, so read the file directly
+        class LocalLexiconAnalyzer(SentimentIntensityAnalyzer):
+            def __init__(self, path):
+                with open(path, encoding='utf-8') as lexicon_file:
+                    self.lexicon_file = lexicon_file.read().strip('\n')
+                self.lexicon = self.make_lex_dict()
+                self.constants = VaderConstants()
+
+        return LocalLexiconAnalyzer(lexicon_path)
+
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        if not auto_download or not nltk.download('vader_lexicon', quiet=True):
+            raise LookupError(
+                "The VADER lexicon is not available. Run nltk.download('vader_lexicon'), or pass "
+                f"lexicon_path / set {LEXICON_PATH_ENV} to a local vader_lexicon.txt."
+            ) from None
+    return SentimentIntensityAnalyzer()
+
+
+def _vader_from_lexicon(lexicon):
+    # Rebuild an analyzer around an already parsed lexicon, e.g. in a worker process
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+
+    analyzer = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+    analyzer.lexicon = lexicon
+    analyzer.constants = VaderConstants()
+    return analyzer
+
+
+def compile_emotion_patterns(emotion_patterns):
+    """
+    Compile emotion patterns for matching in a single pass.
+
+    Patterns that are whole-word alternations such as ``\\b(sad|upset)\\b`` or
+    alternations of literals without word characters, such as emoji, are
+    merged into one regex, and a dict maps each matched keyword back to the
+    patterns it came from. The two kinds can never overlap, so the counts are
+    the same as matching every pattern on its own.
+    Any other pattern is kept as a separate compiled regex.
+
+    Args:
+        emotion_patterns (dict): Emotion -> list of regex patterns
+
+    Returns:
+        tuple: (keyword regex, keyword -> list of (emotion, pattern index),
+               list of ((emotion, pattern index), compiled regex) for other patterns)
+    """
+    words = {}
+    literals = {}
+    others = []
+    for emotion, patterns in emotion_patterns.items():
+        for position, pattern in enumerate(patterns):
+            key = (emotion, position)
+            word_group = _WORD_ALTERNATION.match(pattern)
+            if word_group:
+                for word in set(word_group.group(1).split('|')):
+                    words.setdefault(word, []).append(key)
+            elif pattern and all(re.escape(piece) == piece and not _WORD_CHAR.search(piece)
+                                 for piece in pattern.split('|')):
+                for literal in set(pattern.split('|')):
+                    literals.setdefault(literal, []).append(key)
+            else:
+                others.append((key, re.compile(pattern)))
+
+    alternatives = []
+    if words:
+        alternatives.append(r'\b(?:' + '|'.join(sorted(words, key=len, reverse=True)) + r')\b')
+    # Longest first, so that a literal never hides a longer one it starts
+    alternatives.extend(sorted(literals, key=len, reverse=True))
+    keywords = {literal: list(keys) for literal, keys in literals.items()}
+    for word, keys in words.items():
+        keywords.setdefault(word, []).extend(keys)
+    return re.compile('|'.join(alternatives) or '(?!)'), keywords, others
+
+
+def create_backend(backend='vader', lexicon_path=None, auto_download=True, custom_lexicon=None):
+    """
+    Create a sentiment scoring backend.
+
+    Args:
+        backend (str): One of ``BACKENDS``
+        lexicon_path (str, optional): Lexicon file to use instead of the default one
+        auto_download (bool): Whether the 'vader' backend may download the nltk lexicon
+        custom_lexicon (dict, optional): Words to add to or override in the lexicon
+
+    Returns:
+        object: An analyzer with a ``polarity_scores(text)`` method
+    """
+    if backend == 'lexicon':
+        from .lexicon import LexiconScorer
+        return LexiconScorer(lexicon_path, custom_lexicon)
+    if backend != 'vader':
+        raise ValueError(f"Unknown sentiment backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+    analyzer = load_vader(lexicon_path, auto_download)
+    if custom_lexicon:
+        # Replace rather than update the lexicon, which is not ours to change
+        analyzer.lexicon = {**analyzer.lexicon, **custom_lexicon}
+    return analyzer
+
 
 class SentimentAnalyzer:
-    def __init__(self, custom_threshold=None, custom_lexicon=None, preprocess_text=True):
+    def __init__(self, custom_threshold=None, custom_lexicon=None, preprocess_text=True,
+                 lexicon_path=None, auto_download=True, cache_size=65536, backend='vader', metrics=None):
         """
         Initialize the sentiment analyzer.
 
@@ -15,15 +159,29 @@ class SentimentAnalyzer:
             custom_lexicon (dict, optional): Custom sentiment lexicon to augment the built-in one
                                             e.g., {'awesome': 2.0, 'terrible': -2.0}
             preprocess_text (bool): Whether to preprocess text before analysis
+            lexicon_path (str, optional): Local vader_lexicon.txt to load instead of nltk data,
+                                          defaults to the MAGIC_PROFANITY_VADER_LEXICON variable
+            auto_download (bool): Whether to download the lexicon if nltk data lacks it;
+                                  disable on machines without network access
+            cache_size (int): Number of distinct texts whose scores ``analyze_many``
+                              remembers between calls, 0 to disable
+            backend (str or object): 'vader' for nltk's VADER, 'lexicon' for the bundled
+                                     nltk-free scorer, or any object with a
+                                     ``polarity_scores(text)`` method returning VADER style scores
+            metrics (Metrics, optional): Records the time taken by ``analyze`` and ``analyze_many``
         """
-        # Download necessary resources on first use
-        try:
-            nltk.data.find('vader_lexicon.zip')
-        except LookupError:
-            nltk.download('vader_lexicon')
-
-        self.analyzer = SentimentIntensityAnalyzer()
+        self.metrics = metrics
+        if isinstance(backend, str):
+            self.backend = backend
+            self.analyzer = create_backend(backend, lexicon_path or os.environ.get(LEXICON_PATH_ENV),
+                                           auto_download, custom_lexicon)
+        else:
+            if custom_lexicon:
+                raise ValueError('custom_lexicon only applies to the built-in backends')
+            self.backend = 'custom'
+            self.analyzer = backend
         self.preprocess_text = preprocess_text
+        self.score_cache = LRUCache(cache_size) if cache_size else None
 
         # Set custom thresholds or use defaults
         self.thresholds = {
@@ -33,9 +191,27 @@ class SentimentAnalyzer:
         if custom_threshold:
             self.thresholds.update(custom_threshold)
 
-        # Add custom lexicon words if provided
-        if custom_lexicon:
-            self.analyzer.lexicon.update(custom_lexicon)
+        # All emotion patterns are matched in a single pass over the text
+        self.emotion_patterns = {emotion: list(patterns) for emotion, patterns in EMOTION_PATTERNS.items()}
+        self._compiled_emotions = None
+        self._emotion_regex()
+
+    def __getstate__(self):
+        # The nltk analyzer is sent to worker processes as its lexicon only
+        state = self.__dict__.copy()
+        if self.backend == 'vader':
+            state['analyzer'] = self.analyzer.lexicon
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.backend == 'vader':
+            self.analyzer = _vader_from_lexicon(self.analyzer)
+
+    @property
+    def accepts_tokens(self):
+        """Whether ``score`` can reuse the word offsets of ``ProfanityFilter.tokenize``."""
+        return getattr(self.analyzer, 'accepts_tokens', False)
 
     def preprocess(self, text):
         """
@@ -75,8 +251,80 @@ class SentimentAnalyzer:
                   - 'neu': Neutral score (0 to 1)
                   - 'neg': Negative score (0 to 1)
         """
-        text = self.preprocess(text)
-        return self.analyzer.polarity_scores(text)
+        if self.metrics is None:
+            return self.score(self.preprocess(text))
+        with self.metrics.measure('sentiment.analyze'):
+            return self.score(self.preprocess(text))
+
+    def score(self, preprocessed_text, tokens=None):
+        """
+        Score text that has already been through ``preprocess``.
+
+        Args:
+            preprocessed_text (str): The preprocessed text
+            tokens (array, optional): Word offsets of the text from ``ProfanityFilter.tokenize``,
+                                      used instead of splitting it again if ``accepts_tokens``
+
+        Returns:
+            dict: The same scores as ``analyze``
+        """
+        if tokens is not None and self.accepts_tokens:
+            return self.analyzer.polarity_scores(preprocessed_text, tokens)
+        return self.analyzer.polarity_scores(preprocessed_text)
+
+    def analyze_many(self, texts, workers=None, chunksize=256):
+        """
+        Analyze the sentiment of many texts.
+
+        Texts that are identical after preprocessing are scored once, and
+        scores are remembered across calls in ``score_cache``.
+
+        Args:
+            texts (iterable): The texts to analyze
+            workers (int, optional): Number of worker processes to score with
+            chunksize (int): Number of texts sent to a worker at a time
+
+        Returns:
+            list: Scores as returned by ``analyze``, one dict per text, in input order
+        """
+        if self.metrics is None:
+            return self._analyze_many(texts, workers, chunksize)
+        with self.metrics.measure('sentiment.analyze_many'):
+            return self._analyze_many(texts, workers, chunksize)
+
+    def _analyze_many(self, texts, workers, chunksize):
+        preprocessed = [self.preprocess(text) for text in texts]
+
+        scores = {}
+        missing = []
+        for text in dict.fromkeys(preprocessed):
+            cached = self.score_cache.get(text) if self.score_cache is not None else None
+            if cached is None:
+                missing.append(text)
+            else:
+                scores[text] = cached
+
+        for text, text_scores in zip(missing, imap_texts(self, 'score', missing, workers, chunksize)):
+            scores[text] = text_scores
+            if self.score_cache is not None:
+                self.score_cache.put(text, text_scores)
+
+        # Every text gets its own dict, so callers can change them freely
+        return [dict(scores[text]) for text in preprocessed]
+
+    def get_sentiment_many(self, texts, workers=None, chunksize=256):
+        """
+        Get the sentiment classification of many texts.
+
+        Args:
+            texts (iterable): The texts to analyze
+            workers (int, optional): Number of worker processes to score with
+            chunksize (int): Number of texts sent to a worker at a time
+
+        Returns:
+            list: One of 'positive', 'neutral', or 'negative' per text, in input order
+        """
+        return [self.classify(scores) for scores in self.analyze_many(texts, workers, chunksize)]
 
     def get_sentiment(self, text):
         """
@@ -88,7 +336,18 @@ class SentimentAnalyzer:
         Returns:
             str: One of 'positive', 'neutral', or 'negative'
         """
-        scores = self.analyze(text)
+        return self.classify(self.analyze(text))
+
+    def classify(self, scores):
+        """
+        Classify already computed sentiment scores.
+
+        Args:
+            scores (dict): Scores as returned by ``analyze``
+
+        Returns:
+            str: One of 'positive', 'neutral', or 'negative'
+        """
         compound = scores['compound']
 
         if compound >= self.thresholds['positive']:
@@ -98,12 +357,13 @@ class SentimentAnalyzer:
         else:
             return 'neutral'
 
-    def get_detailed_analysis(self, text):
+    def get_detailed_analysis(self, text, scores=None):
         """
         Get a detailed sentiment analysis with confidence levels.
 
         Args:
             text (str): The text to analyze
+            scores (dict, optional): Scores already computed by ``analyze`` for this text
 
         Returns:
             dict: Detailed sentiment analysis including:
@@ -112,7 +372,8 @@ class SentimentAnalyzer:
                   - 'scores': Raw sentiment scores
                   - 'emotion_indicators': Detected emotion indicators
         """
-        scores = self.analyze(text)
+        if scores is None:
+            scores = self.analyze(text)
         compound = scores['compound']
 
         # Determine classification
@@ -151,25 +412,31 @@ class SentimentAnalyzer:
         Returns:
             dict: Detected emotions with confidence scores
         """
-        # Simple emotion detection dictionary
-        emotion_patterns = {
-            'joy': [r'\b(happy|joy|delighted|excited|love|wonderful|great)\b', r'😊|😄|😃|😁|😀'],
-            'anger': [r'\b(angry|mad|furious|outraged|annoyed)\b', r'😠|😡|🤬'],
-            'sadness': [r'\b(sad|unhappy|depressed|miserable|upset)\b', r'😢|😭|😔|☹️'],
-            'fear': [r'\b(afraid|scared|terrified|worried|anxious)\b', r'😨|😰|😱'],
-            'surprise': [r'\b(surprised|shocked|amazed|astonished)\b', r'😲|😮|😯'],
-            'disgust': [r'\b(disgusted|gross|yuck|ew)\b', r'🤢|🤮']
-        }
+        patterns, regex, keywords, others = self._emotion_regex()
+        text = text.lower()
+
+        counts = {}
+        for keyword in regex.findall(text):
+            for key in keywords[keyword]:
+                counts[key] = counts.get(key, 0) + 1
+        for key, pattern in others:
+            counts[key] = counts.get(key, 0) + len(pattern.findall(text))
 
         results = {}
 
-        for emotion, patterns in emotion_patterns.items():
+        for emotion, emotion_patterns in patterns.items():
             score = 0
-            for pattern in patterns:
-                matches = re.findall(pattern, text.lower())
-                score += len(matches) * 0.2  # 0.2 confidence per match
+            for position in range(len(emotion_patterns)):
+                score += counts.get((emotion, position), 0) * 0.2  # 0.2 confidence per match
 
             if score > 0:
                 results[emotion] = min(1.0, score)  # Cap at 1.0
 
-        return results
\ No newline at end of file
+        return results
+
+    def _emotion_regex(self):
+        # Compiled at construction and again whenever emotion_patterns is changed
+        if self._compiled_emotions is None or self._compiled_emotions[0] != self.emotion_patterns:
+            snapshot = {emotion: list(patterns) for emotion, patterns in self.emotion_patterns.items()}
+            self._compiled_emotions = (snapshot,) + compile_emotion_patterns(snapshot)
+        return self._compiled_emotions
@@ -0,0 +1,308 @@
+import marshal
+import mmap
+import sys
+from array import array
+from bisect import bisect_left
+
+from .index import END, OverlayIndex, WordIndex, _generations
+
+# Buffer layout: MAGIC, one byte FORMAT_VERSION, one byte for the byte order,
+# a 4-byte length and that many bytes of marshalled metadata, then the
+# sections listed in the metadata, each aligned to 8 bytes. Trie nodes are
+# numbered breadth first; the edges of node ``i`` are
+# ``edge_chars[edge_starts[i]:edge_starts[i + 1]]``, sorted by code point.
+MAGIC = b"MPFLAT"
+FORMAT_VERSION = 2
+_BYTE_ORDERS = {"little": 0, "big": 1}
+_SECTIONS = ("edge_starts", "edge_chars", "edge_targets", "terminals", "word_starts", "word_data")
+
+# A DeltaIndex is flattened again once it holds more changed words than this,
+# or than an eighth of the words of its base if that is more
+MIN_DELTA_SIZE = 256
+
+# Shared memory blocks created by this process, which already own their
+# resource tracker registration
+_created_blocks = set()
+
+
+def flatten(index):
+    """Serialize ``index`` into the flat layout read by ``FlatIndex``."""
+    index = index.thawed()
+    edge_starts = array("i", [0])
+    edge_chars = array("i")
+    edge_targets = array("i")
+    terminals = array("i")
+    word_ids = {}
+    words = []
+
+    nodes = [index._trie]
+    for node in nodes:
+        word = node.get(END)
+        if word is None:
+            terminals.append(-1)
+        else:
+            if word not in word_ids:
+                word_ids[word] = len(words)
+                words.append(word)
+            terminals.append(word_ids[word])
+        for char in sorted((char for char in node if char != END), key=ord):
+            edge_chars.append(ord(char))
+            edge_targets.append(len(nodes))
+            nodes.append(node[char])
+        edge_starts.append(len(edge_chars))
+
+    word_starts = array("i", [0])
+    encoded = []
+    for word in words:
+        encoded.append(word.encode("utf-8"))
+        word_starts.append(word_starts[-1] + len(encoded[-1]))
+
+    sections = {
+        "edge_starts": edge_starts.tobytes(),
+        "edge_chars": edge_chars.tobytes(),
+        "edge_targets": edge_targets.tobytes(),
+        "terminals": terminals.tobytes(),
+        "word_starts": word_starts.tobytes(),
+        "word_data": b"".join(encoded),
+    }
+    layout = {}
+    offset = 0
+    for name in _SECTIONS:
+        layout[name] = (offset, len(sections[name]))
+        offset += -len(sections[name]) % 8 + len(sections[name])
+    meta = marshal.dumps({
+        "char_map": index.char_map,
+        "reverse": index._reverse,
+        "piece_lengths": index._piece_lengths,
+        "min_length": index.min_length,
+        "max_length": index.max_length,
+        "max_num_combinations": index.max_num_combinations,
+        "word_count": len(words),
+        "sections": layout,
+    })
+
+    header = MAGIC + bytes([FORMAT_VERSION, _BYTE_ORDERS[sys.byteorder]]) + len(meta).to_bytes(4, "little")
+    parts = [header, meta, bytes(-(len(header) + len(meta)) % 8)]
+    for name in _SECTIONS:
+        parts.append(sections[name])
+        parts.append(bytes(-len(sections[name]) % 8))
+    return b"".join(parts)
+
+
+class FlatIndex(WordIndex):
+    """Read-only ``WordIndex`` stored in a single flat buffer.
+
+    The buffer can be a ``bytes`` object, an mmap'd file or a
+    ``multiprocessing.shared_memory`` block; the trie is read through
+    memoryviews and never copied, so any number of processes can use one copy.
+    A flat index takes a fraction of the memory of the dict trie of a
+    ``WordIndex``, so filters keep the indexes they publish in this form.
+    ``updated`` returns a ``DeltaIndex`` with the changes applied.
+    """
+
+    def __init__(self, buffer, source=None):
+        view = memoryview(buffer)
+        header_size = len(MAGIC) + 6
+        if len(view) < header_size or bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Buffer does not hold a flat wordlist index")
+        if view[len(MAGIC)] != FORMAT_VERSION or view[len(MAGIC) + 1] != _BYTE_ORDERS[sys.byteorder]:
+            raise ValueError("Flat wordlist index was written by an incompatible version or platform")
+        meta_size = int.from_bytes(view[len(MAGIC) + 2:header_size], "little")
+        try:
+            meta = marshal.loads(view[header_size:header_size + meta_size])
+        except (EOFError, TypeError, ValueError) as e:
+            raise ValueError(f"Flat wordlist index is corrupted - {e}") from e
+
+        self.char_map = meta["char_map"]
+        self.max_num_combinations = meta["max_num_combinations"]
+        self.min_length = meta["min_length"]
+        self.max_length = meta["max_length"]
+        self.generation = next(_generations)
+        self._reverse = meta["reverse"]
+        # Code points of the characters a piece can stand for, as compared
+        # against edge_chars
+        self._reverse_codes = {piece: tuple(ord(char) for char in chars) for piece, chars in self._reverse.items()}
+        self._piece_lengths = meta["piece_lengths"]
+        self._word_count = meta["word_count"]
+        self._buffer = buffer
+        self._source = source
+
+        base = header_size + meta_size + -(header_size + meta_size) % 8
+        sections = {}
+        for name, (offset, size) in meta["sections"].items():
+            section = view[base + offset:base + offset + size]
+            sections[name] = section if name == "word_data" else section.cast("i")
+        self._edge_starts = sections["edge_starts"]
+        self._edge_chars = sections["edge_chars"]
+        self._edge_targets = sections["edge_targets"]
+        self._terminals = sections["terminals"]
+        self._word_starts = sections["word_starts"]
+        self._word_data = sections["word_data"]
+
+    def __reduce__(self):
+        # Copies sent to other processes attach to the same memory or file
+        # instead of carrying the whole buffer along where possible. char_map
+        # is passed as state so that it stays the filter's own dict.
+        if self._source is not None:
+            return _reopen, self._source, {"char_map": self.char_map}
+        return FlatIndex, (bytes(self._buffer),), {"char_map": self.char_map}
+
+    def __len__(self):
+        return self._word_count
+
+    def words(self):
+        for word_id in range(self._word_count):
+            yield self._word(word_id)
+
+    def add(self, word):
+        raise TypeError("FlatIndex is read-only, use updated() to get a modified copy")
+
+    def updated(self, add=(), remove=(), max_num_combinations=None):
+        return DeltaIndex(self).updated(add, remove, max_num_combinations)
+
+    def thawed(self):
+        return WordIndex(self.words(), char_map=self.char_map, max_num_combinations=self.max_num_combinations)
+
+    def prefix_matches(self, string, exclude=None, counts=None):
+        # Same walk as WordIndex.prefix_matches over node numbers
+        edge_starts = self._edge_starts
+        edge_chars = self._edge_chars
+        edge_targets = self._edge_targets
+        terminals = self._terminals
+        reverse_codes = self._reverse_codes
+        char_map = self.char_map
+        end = len(string)
+        pending = {0: {0: None}}
+        while pending:
+            pos = min(pending)
+            nodes = pending.pop(pos)
+            if counts is not None:
+                counts["trie_steps"] += len(nodes)
+            for node in nodes:
+                word_id = terminals[node]
+                if word_id >= 0:
+                    word = self._word(word_id)
+                    if exclude is None or word not in exclude:
+                        yield pos, word
+                        break
+            for length in self._piece_lengths:
+                if pos + length > end:
+                    break
+                piece = string[pos:pos + length]
+                codes = reverse_codes.get(piece)
+                if codes is None:
+                    if length > 1 or piece in char_map:
+                        continue
+                    codes = (ord(piece),)
+                reached = None
+                for node in nodes:
+                    first, last = edge_starts[node], edge_starts[node + 1]
+                    if first == last:
+                        continue
+                    for code in codes:
+                        if last - first == 1:
+                            # Most nodes deep in the trie have a single edge
+                            edge = first if edge_chars[first] == code else last
+                        else:
+                            edge = bisect_left(edge_chars, code, first, last)
+                            if edge < last and edge_chars[edge] != code:
+                                edge = last
+                        if edge < last:
+                            if reached is None:
+                                reached = pending.setdefault(pos + length, {})
+                            reached[edge_targets[edge]] = None
+
+    def has_word(self, word):
+        node = 0
+        for char in word:
+            first, last = self._edge_starts[node], self._edge_starts[node + 1]
+            edge = bisect_left(self._edge_chars, ord(char), first, last)
+            if edge == last or self._edge_chars[edge] != ord(char):
+                return False
+            node = self._edge_targets[edge]
+        return self._terminals[node] >= 0
+
+    def _word(self, word_id):
+        return str(self._word_data[self._word_starts[word_id]:self._word_starts[word_id + 1]], "utf-8")
+
+
+class DeltaIndex(OverlayIndex):
+    """Words added to and removed from a ``FlatIndex`` since it was built.
+
+    Only the changed words are kept in a small ``WordIndex``, so an update
+    costs time and memory in proportion to the change. ``compact`` flattens
+    the whole wordlist again once the changes grow large.
+    """
+
+    def changes(self):
+        return len(self._extra) + len(self._allowed)
+
+
+def compact(index):
+    """Return ``index`` in the form a filter keeps it in.
+
+    A plain ``WordIndex`` and a ``DeltaIndex`` with many changes are
+    flattened into a ``FlatIndex``. Overlays and flat indexes are returned as
+    they are.
+    """
+    if type(index) is DeltaIndex:
+        if index.changes() <= max(MIN_DELTA_SIZE, len(index.base) // 8):
+            return index
+    elif type(index) is not WordIndex:
+        return index
+    flat = FlatIndex(flatten(index))
+    flat.char_map = index.char_map
+    return flat
+
+
+def share_index(index, name=None):
+    """Copy ``index`` into a new shared memory block and return the block.
+
+    The caller owns the block and has to ``close()`` and ``unlink()`` it once
+    no process needs it any more.
+    """
+    from multiprocessing import shared_memory
+
+    data = flatten(index)
+    block = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+    block.buf[:len(data)] = data
+    _created_blocks.add(block.name)
+    return block
+
+
+def attach_index(name):
+    """Return a ``FlatIndex`` reading the shared memory block called ``name``."""
+    from multiprocessing import shared_memory
+
+    try:
+        block = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the block with the resource
+        # tracker, which would unlink it when this process exits
+        from multiprocessing import resource_tracker
+
+        block = shared_memory.SharedMemory(name=name)
+        if block.name not in _created_blocks:
+            resource_tracker.unregister(block._name, "shared_memory")
+    index = FlatIndex(block.buf, source=("shared_memory", name))
+    # Keep the block open for as long as the index uses its buffer
+    index._block = block
+    return index
+
+
+def save_index(path, index):
+    with open(path, "wb") as index_file:
+        index_file.write(flatten(index))
+
+
+def map_index(path):
+    """Return a ``FlatIndex`` reading the file at ``path`` through mmap."""
+    with open(path, "rb") as index_file:
+        mapped = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+    return FlatIndex(mapped, source=("file", path))
+
+
+def _reopen(kind, location):
+    if kind == "shared_memory":
+        return attach_index(location)
+    return map_index(location)
@@ -0,0 +1,20 @@
+from .shared import FlatIndex, flatten
+from .utils import load_marshalled, save_marshalled
+
+# Snapshot files use the save_marshalled layout with this magic and version.
+# The index is stored in the flat layout of shared.flatten.
+MAGIC = b"MPSNAP"
+FORMAT_VERSION = 4
+
+
+def save_snapshot(path, index, source=None):
+    save_marshalled(path, MAGIC, FORMAT_VERSION, {"index": flatten(index), "source": source})
+
+
+def load_snapshot(path):
+    payload = load_marshalled(path, MAGIC, FORMAT_VERSION, "compiled wordlist snapshot")
+    try:
+        index = FlatIndex(payload["index"])
+        return index, payload["source"]
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"'{path}' is corrupted - {e}") from e
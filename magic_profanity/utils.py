@@ -1,3 +1,5 @@
+import hashlib
+import marshal
 import os.path
 
 def get_complete_path_of_file(filename):
@@ -14,18 +16,50 @@ def read_wordlist(filename):
 def get_replacement_for_swear_word(censor_char):
     return censor_char * 4
 
-def any_next_words_form_swear_word(current_word, word_indices, censor_words):
-    full_word = current_word.lower()
-    full_word_with_separators = current_word.lower()
+def any_next_words_form_swear_word(text, tokens, word_position, max_words, censor_words):
+    # tokens is the flat offset array from engine.tokenize; returns the position
+    # of the last word of the shortest phrase starting at word_position.
+    start, end = tokens[2 * word_position], tokens[2 * word_position + 1]
+    full_word = text[start:end].lower()
+    full_word_with_separators = full_word
 
-    for index in range(0, len(word_indices), 2):
-        single_word, end_index = word_indices[index]
-        word_with_separators, _ = word_indices[index + 1]
-        if single_word == "":
-            continue
+    for position in range(word_position + 1, min(len(tokens) // 2, word_position + max_words + 1)):
+        word_start, word_end = tokens[2 * position], tokens[2 * position + 1]
+        # A one-character word at the very end of the text is never looked ahead to
+        if word_start >= len(text) - 1:
+            break
 
-        full_word += single_word.lower()
-        full_word_with_separators += word_with_separators.lower()
+        full_word += text[word_start:word_end].lower()
+        full_word_with_separators += text[tokens[2 * position - 1]:word_end].lower()
         if full_word in censor_words or full_word_with_separators in censor_words:
-            return True, end_index
+            return True, position
     return False, -1
+
+def get_file_digest(filename):
+    with open(filename, "rb") as source_file:
+        return hashlib.sha1(source_file.read()).hexdigest()
+
+def save_marshalled(path, magic, version, payload):
+    # File layout: ``magic``, one byte ``version``, one byte marshal.version,
+    # then the marshalled payload. marshal only handles plain builtin types,
+    # so loading never runs code and needs no parsing beyond the payload.
+    with open(path, "wb") as output_file:
+        output_file.write(magic + bytes([version, marshal.version]))
+        marshal.dump(payload, output_file)
+
+def load_marshalled(path, magic, version, kind):
+    # Returns the payload written by save_marshalled; ``kind`` names the file
+    # in errors. Callers reading keys of the payload should treat KeyError
+    # and TypeError as corruption too.
+    with open(path, "rb") as input_file:
+        data = input_file.read()
+
+    header_size = len(magic) + 2
+    if len(data) < header_size or not data.startswith(magic):
+        raise ValueError(f"'{path}' is not a {kind}")
+    if data[len(magic)] != version or data[len(magic) + 1] != marshal.version:
+        raise ValueError(f"'{path}' was compiled by an incompatible version and must be rebuilt")
+    try:
+        return marshal.loads(data[header_size:])
+    except (EOFError, TypeError, ValueError) as e:
+        raise ValueError(f"'{path}' is corrupted - {e}") from e
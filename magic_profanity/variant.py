@@ -1,25 +1,64 @@
-from typing import Dict, Iterator, Tuple
+# Per-character substitutions and length bounds, shared by every VariantString
+# built from an equal char_map. Keyed by the map's contents, so every filter
+# with the default map shares one table, and bounded, so maps that come and
+# go cannot pile up.
+_char_tables = {}
+_MAX_CHAR_TABLES = 64
+# (char_map, a copy of it, its table) for the map used last, which skips
+# building the key while one map is used over and over
+_last_char_table = None
+_identity_entries = {}
+
+
+def char_table(char_map):
+    global _last_char_table
+    last = _last_char_table
+    if last is not None and last[0] is char_map and last[1] == char_map:
+        return last[2]
+    key = tuple(sorted((char, tuple(substitutions)) for char, substitutions in char_map.items()))
+    table = _char_tables.get(key)
+    if table is None:
+        table = {}
+        for char, substitutions in char_map.items():
+            lengths = [len(c) for c in substitutions]
+            table[char] = (substitutions, min(lengths), max(lengths))
+        if len(_char_tables) >= _MAX_CHAR_TABLES:
+            # Evict the oldest table
+            _char_tables.pop(next(iter(_char_tables)), None)
+        _char_tables[key] = table
+    _last_char_table = (char_map, dict(char_map), table)
+    return table
+
+
+def _identity_entry(char):
+    # Characters without substitutions only match themselves
+    entry = (char,), 1, 1
+    _identity_entries[char] = entry
+    return entry
+
+
+def _char_entries(string, char_map):
+    table = char_table(char_map)
+    return [table.get(char) or _identity_entries.get(char) or _identity_entry(char) for char in string]
+
+
+def length_bounds(string, char_map):
+    entries = _char_entries(string, char_map)
+    return sum(entry[1] for entry in entries), sum(entry[2] for entry in entries)
+
 
 class VariantString:
+    __slots__ = ("_original", "_char_map", "_min_len", "_max_len", "_char_combos")
+
     def __init__(self, string, char_map=None):
         if char_map is None:
             char_map = {}
         self._original = string
         self._char_map = char_map
-        self._min_len = 0
-        self._max_len = 0
-        self._char_combos = []
-        for char in self._original:
-            if char in self._char_map:
-                substitutions = self._char_map[char]
-                self._char_combos.append(substitutions)
-                lengths = [len(c) for c in substitutions]
-                self._min_len += min(lengths)
-                self._max_len += max(lengths)
-            else:
-                self._char_combos.append((char,))
-                self._min_len += 1
-                self._max_len += 1
+        entries = _char_entries(string, char_map)
+        self._char_combos = tuple(entry[0] for entry in entries)
+        self._min_len = sum(entry[1] for entry in entries)
+        self._max_len = sum(entry[2] for entry in entries)
 
     def __str__(self):
         return self._original
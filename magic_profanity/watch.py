@@ -0,0 +1,74 @@
+import os
+import threading
+
+
+class WordlistWatcher:
+    """Reload a filter's wordlist whenever its file changes.
+
+    The file is polled every ``interval`` seconds from a daemon thread and
+    compared by modification time and size. A change is applied only once the
+    file has stayed the same for a whole interval, so a file that is still
+    being written is not loaded half way. If reloading fails the current
+    wordlist stays in place and the exception is kept in ``error``.
+    """
+
+    def __init__(self, profanity_filter, filename, interval=1.0, **kwargs):
+        if interval <= 0:
+            raise ValueError("interval must be a positive number of seconds")
+        self.profanity_filter = profanity_filter
+        self.filename = filename
+        self.interval = interval
+        self.kwargs = kwargs
+        self.reloads = 0
+        self.error = None
+        self._signature = self._stat()
+        self._pending = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="WordlistWatcher", daemon=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def poll(self):
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            # Changed since the last poll, wait for it to settle
+            self._pending = signature
+            return False
+
+        self._signature = signature
+        self._pending = None
+        try:
+            self.profanity_filter.reload_from_file(self.filename, **self.kwargs)
+        except Exception as e:
+            self.error = e
+            return False
+        self.error = None
+        self.reloads += 1
+        return True
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.poll()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -5,9 +5,26 @@ from magic_profanity import __version__
 import os
 import setuptools
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
 
 VERSION = __version__
 
+
+class BuildPyWithSnapshot(build_py):
+    """Precompile the default data files into the build so imports skip parsing them."""
+
+    def run(self):
+        super().run()
+        if not self.dry_run:
+            from magic_profanity.constants import compile_allowed_characters
+            from magic_profanity.lexicon import compile_default_lexicon
+            from magic_profanity.magic_profanity import ProfanityFilter
+            target = os.path.join(self.build_lib, "magic_profanity", "wordlist.snapshot")
+            ProfanityFilter().save_compiled(target)
+            compile_allowed_characters(os.path.join(self.build_lib, "magic_profanity", "unicode.marshal"))
+            compile_default_lexicon(os.path.join(self.build_lib, "magic_profanity", "sentiment_lexicon.marshal"))
+
+
 # Get the long description from README.md
 here = os.path.abspath(os.path.dirname(__file__))
 with open(os.path.join(here, 'README.md'), encoding='utf-8') as f:
@@ -39,7 +56,11 @@ setuptools.setup(
     ],
     # Include data files
     package_data={
-        "magic_profanity": ["wordlist.txt", "unicode.json"]
+        "magic_profanity": ["wordlist.txt", "unicode.json", "sentiment_lexicon.txt"]
     },
     include_package_data=True,
+    entry_points={
+        "console_scripts": ["magic-profanity=magic_profanity.cli:main"],
+    },
+    cmdclass={"build_py": BuildPyWithSnapshot},
 )
\ No newline at end of file
@@ -0,0 +1,90 @@
+import asyncio
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from magic_profanity.magic_profanity import ProfanityFilter
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+class TestAsync(unittest.TestCase):
+    def setUp(self):
+        self.profanity_filter = ProfanityFilter(enable_enhancement=True)
+        self.texts = ["This damn product", "hello world", "sh1t happens", "", "all clean here"] * 4
+
+    def gather(self, make_call):
+        async def run():
+            return await asyncio.gather(*(make_call(text) for text in self.texts))
+        return asyncio.run(run())
+
+    def test_results_match_sync(self):
+        """The async methods return what the synchronous ones do."""
+        self.assertEqual(self.gather(lambda text: self.profanity_filter.acensor_text(text, "#")),
+                         [self.profanity_filter.censor_text(text, "#") for text in self.texts])
+        self.assertEqual(self.gather(self.profanity_filter.ahas_profanity),
+                         [self.profanity_filter.has_profanity(text) for text in self.texts])
+        self.assertEqual(self.gather(self.profanity_filter.aanalyze_text),
+                         [self.profanity_filter.analyze_text(text) for text in self.texts])
+
+    def test_micro_batching(self):
+        """Concurrent calls are dispatched in batches of at most max_batch_size."""
+        with CountingExecutor() as executor:
+            batcher = self.profanity_filter.configure_async(executor, max_batch_size=8, max_wait=1.0)
+            self.gather(self.profanity_filter.acensor_text)
+        self.assertEqual((batcher.batches, batcher.texts, executor.submitted), (3, 20, 3))
+
+    def test_max_wait(self):
+        """A batch that never fills up is dispatched after max_wait."""
+        batcher = self.profanity_filter.configure_async(max_batch_size=1000, max_wait=0.01)
+        self.assertTrue(asyncio.run(self.profanity_filter.ahas_profanity("damn")))
+        self.assertEqual(batcher.batches, 1)
+
+    def test_arguments_split_batches(self):
+        """Calls with different arguments never share a batch."""
+        batcher = self.profanity_filter.configure_async(max_wait=0.01)
+
+        async def run():
+            return await asyncio.gather(self.profanity_filter.acensor_text("damn"),
+                                        self.profanity_filter.acensor_text("damn", "#"),
+                                        self.profanity_filter.ahas_profanity("damn"))
+        self.assertEqual(asyncio.run(run()), ["****", "####", True])
+        self.assertEqual(batcher.batches, 3)
+
+    def test_errors_stay_with_their_call(self):
+        """A text that fails does not fail the rest of its batch."""
+        async def run():
+            return await asyncio.gather(self.profanity_filter.acensor_text("damn"),
+                                        self.profanity_filter.acensor_text(None), return_exceptions=True)
+        result, error = asyncio.run(run())
+        self.assertEqual(result, "****")
+        self.assertIsInstance(error, TypeError)
+
+    def test_overlay_and_pickle(self):
+        """Tenants batch their own calls, and copies start without a batcher."""
+        self.profanity_filter.configure_async()
+        tenant = self.profanity_filter.overlay(["widget"])
+
+        async def run():
+            return await asyncio.gather(self.profanity_filter.acensor_text("widget"), tenant.acensor_text("widget"))
+        self.assertEqual(asyncio.run(run()), ["widget", "****"])
+        self.assertIsNot(tenant._batcher, self.profanity_filter._batcher)
+        self.assertIsNone(pickle.loads(pickle.dumps(self.profanity_filter))._batcher)
+
+    def test_invalid_options(self):
+        """Batch sizes below one and negative waits are rejected."""
+        with self.assertRaises(ValueError):
+            self.profanity_filter.configure_async(max_batch_size=0)
+        with self.assertRaises(ValueError):
+            self.profanity_filter.configure_async(max_wait=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
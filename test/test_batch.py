@@ -0,0 +1,31 @@
+import unittest
+from magic_profanity.magic_profanity import ProfanityFilter
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.profanity_filter = ProfanityFilter(enable_enhancement=True)
+        self.texts = ["This damn product", "hello world", "sh1t happens", "", "all clean here"] * 20
+
+    def test_serial(self):
+        """Batch results match the single-text methods, in order."""
+        self.assertEqual(self.profanity_filter.censor_many(self.texts),
+                         [self.profanity_filter.censor_text(text) for text in self.texts])
+        self.assertEqual(self.profanity_filter.has_profanity_many(iter(self.texts)),
+                         [self.profanity_filter.has_profanity(text) for text in self.texts])
+
+    def test_process_pool(self):
+        """The process pool returns the same results as the serial path."""
+        self.assertEqual(self.profanity_filter.censor_many(self.texts, censor_char="#", workers=2, chunksize=8),
+                         self.profanity_filter.censor_many(self.texts, censor_char="#"))
+        self.assertEqual(self.profanity_filter.has_profanity_many(self.texts, workers=2),
+                         self.profanity_filter.has_profanity_many(self.texts))
+
+    def test_invalid_workers(self):
+        """A non-positive worker count is rejected."""
+        with self.assertRaises(ValueError):
+            self.profanity_filter.censor_many(self.texts, workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "benchmarks", "run.py")
+
+
+class TestBenchmarks(unittest.TestCase):
+    def run_script(self, *args):
+        return subprocess.run([sys.executable, SCRIPT, "--size", "5", "--repeat", "1", *args],
+                              capture_output=True, text=True, cwd=ROOT)
+
+    def test_results_and_baseline(self):
+        """The suite writes JSON results and compares them against a baseline."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            run = self.run_script("--benchmark", "censor_text", "--corpus", "leetspeak", "--output", output)
+            self.assertEqual(run.returncode, 0, run.stderr)
+            with open(output, encoding="utf-8") as output_file:
+                report = json.load(output_file)
+            result = report["benchmarks"]["censor_text/leetspeak"]
+            self.assertEqual(result["operations"], 5)
+            self.assertGreater(result["ns_per_char"], 0)
+            self.assertGreater(result["peak_memory_bytes"], 0)
+
+            # A baseline that was a million times faster makes every benchmark a regression
+            result["seconds_per_op"] /= 1e6
+            with open(output, "w", encoding="utf-8") as output_file:
+                json.dump(report, output_file)
+            run = self.run_script("--benchmark", "censor_text", "--corpus", "leetspeak", "--baseline", output)
+            self.assertEqual(run.returncode, 1)
+            self.assertEqual(json.loads(run.stdout)["comparison"]["regressions"], ["censor_text/leetspeak"])
+
+    def test_corpora_are_reproducible(self):
+        """The same seed always generates the same corpus."""
+        code = ("import hashlib, sys; sys.path.insert(0, 'benchmarks'); from corpora import CORPORA, build_corpus; "
+                "texts = [text for name in CORPORA for text in build_corpus(name, 20, 3)]; "
+                "print(hashlib.sha1('\\0'.join(texts).encode()).hexdigest())")
+        outputs = {subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                  cwd=ROOT).stdout for _ in range(2)}
+        self.assertEqual(len(outputs), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from magic_profanity.cache import LRUCache
+from magic_profanity.magic_profanity import ProfanityFilter
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.profanity_filter = ProfanityFilter(cache_size=2, enable_enhancement=True)
+
+    def test_disabled_by_default(self):
+        """Filters do not cache unless asked to."""
+        self.assertIsNone(ProfanityFilter().cache_stats())
+
+    def test_hits_misses_and_evictions(self):
+        """Repeated calls are served from the cache and the oldest entries are evicted."""
+        for text in ["lol", "lol", "damn", "lol", "hi"]:
+            self.profanity_filter.censor_text(text)
+        stats = self.profanity_filter.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 3, 1))
+        self.assertEqual(stats["entries"], 2)
+
+    def test_falsy_results_are_cached(self):
+        """A cached False from has_profanity counts as a hit."""
+        self.assertFalse(self.profanity_filter.has_profanity("hello"))
+        self.assertFalse(self.profanity_filter.has_profanity("hello"))
+        self.assertEqual(self.profanity_filter.cache_stats()["hits"], 1)
+
+    def test_wordset_changes_invalidate(self):
+        """Changing the wordset drops results computed with the old one."""
+        self.assertEqual(self.profanity_filter.censor_text("that sucks"), "that sucks")
+        self.profanity_filter.add_custom_words(["sucks"])
+        self.assertEqual(self.profanity_filter.censor_text("that sucks"), "that ****")
+        self.profanity_filter.load_words(["that"])
+        self.assertEqual(self.profanity_filter.censor_text("that sucks"), "**** sucks")
+
+    def test_analyze_results_are_copies(self):
+        """Mutating a returned analysis does not corrupt the cached one."""
+        first = self.profanity_filter.analyze_text("This damn product")
+        first["censored_text"] = "changed"
+        self.assertEqual(self.profanity_filter.analyze_text("This damn product")["censored_text"],
+                         "This **** product")
+
+    def test_byte_limit(self):
+        """Entries are evicted to stay within max_bytes and oversized values are skipped."""
+        cache = LRUCache(max_entries=100, max_bytes=400)
+        cache.put("a", "x" * 100)
+        cache.put("b", "y" * 100)
+        cache.put("c", "z" * 100)
+        self.assertLessEqual(cache.stats()["bytes"], 400)
+        self.assertGreater(cache.evictions, 0)
+        cache.put("d", "w" * 1000)
+        self.assertIsNone(cache.get("d"))
+
+
+if __name__ == "__main__":
+    unittest.main()
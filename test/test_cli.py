@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from magic_profanity.cli import main
+from magic_profanity.magic_profanity import ProfanityFilter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCommandLine(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def run_main(self, content, *args):
+        with open(self.path("input"), "w", encoding="utf-8", newline="") as input_file:
+            input_file.write(content)
+        status = main([self.path("input"), "-o", self.path("output"), "-q", *args])
+        with open(self.path("output"), encoding="utf-8", newline="") as output_file:
+            return status, output_file.read()
+
+    def test_censor_text_lines(self):
+        """Every line is censored, keeping its line ending."""
+        status, output = self.run_main("what the fuck\r\nclean line\nholy shit", "--censor-char", "#")
+        self.assertEqual(status, 0)
+        self.assertEqual(output, "what the ####\r\nclean line\nholy ####")
+
+    def test_jsonl_detect(self):
+        """JSONL records gain a result field; records without the text field are copied."""
+        records = [{"id": 1, "body": "damn it"}, {"id": 2, "body": "hello"}, {"id": 3}]
+        content = "\n".join(json.dumps(record) for record in records) + "\n"
+        status, output = self.run_main(content, "--format", "jsonl", "--field", "body", "--mode", "detect")
+        self.assertEqual(status, 0)
+        lines = output.splitlines()
+        self.assertEqual([json.loads(line).get("contains_profanity") for line in lines], [True, False, None])
+        self.assertEqual(lines[2], json.dumps(records[2]))
+
+    def test_jsonl_line_endings(self):
+        """JSONL output keeps the line ending of every input line."""
+        status, output = self.run_main('{"text": "damn"}\r\n{"text": "fine"}', "--format", "jsonl")
+        self.assertEqual(status, 0)
+        self.assertEqual(output, '{"text": "****"}\r\n{"text": "fine"}')
+
+    def test_jsonl_analyze(self):
+        """analyze writes the analyze_text result of every record."""
+        status, output = self.run_main('{"text": "You should never say damn"}\n', "--format", "jsonl",
+                                       "--mode", "analyze", "--enhancement")
+        self.assertEqual(status, 0)
+        analysis = json.loads(output)["analysis"]
+        self.assertEqual(analysis["censored_text"], "You should never say ****")
+        self.assertIn("enhancement_suggestions", analysis)
+
+    def test_workers_keep_order(self):
+        """Results from worker processes come out in input order."""
+        lines = [f"line {number} {'shit' if number % 3 == 0 else 'fine'}" for number in range(300)]
+        status, output = self.run_main("\n".join(lines) + "\n", "-w", "2", "--chunksize", "16")
+        self.assertEqual(status, 0)
+        profanity_filter = ProfanityFilter()
+        self.assertEqual(output.splitlines(), [profanity_filter.censor_text(line) for line in lines])
+
+    def test_invalid_json(self):
+        """Invalid JSON fails the run and names the line."""
+        run = subprocess.run([sys.executable, "-m", "magic_profanity", "--format", "jsonl"],
+                             input='{"text": "ok"}\n{broken\n', capture_output=True, text=True, cwd=ROOT)
+        self.assertEqual(run.returncode, 1)
+        self.assertIn("-:2: invalid JSON", run.stderr)
+
+    def test_stdin_and_report(self):
+        """Text from stdin is censored, with a throughput report on stderr."""
+        run = subprocess.run([sys.executable, "-m", "magic_profanity"], input="oh shit\nfine\n",
+                             capture_output=True, text=True, cwd=ROOT)
+        self.assertEqual(run.returncode, 0, run.stderr)
+        self.assertEqual(run.stdout, "oh ****\nfine\n")
+        self.assertIn("2 lines", run.stderr)
+        self.assertIn("1 with profanity", run.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import importlib.util
+import unittest
+from unittest import mock
+from magic_profanity.magic_profanity import ProfanityFilter
+
+HAVE_PANDAS = importlib.util.find_spec("pandas") is not None
+
+
+class TestColumns(unittest.TestCase):
+    def setUp(self):
+        self.profanity_filter = ProfanityFilter()
+        self.values = ["damn it", None, "hello", float("nan"), "damn it", "sh1t"]
+
+    def test_list(self):
+        """Lists give lists, with missing values passed through or False."""
+        censored = self.profanity_filter.censor_array(self.values, censor_char="#")
+        self.assertEqual(censored[:3] + censored[4:], ["#### it", None, "hello", "#### it", "####"])
+        self.assertNotEqual(censored[3], censored[3])
+        self.assertEqual(self.profanity_filter.has_profanity_array(self.values),
+                         [True, False, False, False, True, True])
+
+    def test_distinct_values_scanned_once(self):
+        """Repeated values are censored once."""
+        with mock.patch.object(self.profanity_filter, "censor_many", wraps=self.profanity_filter.censor_many) as spy:
+            self.profanity_filter.censor_array(["damn", "ok", "damn", "ok", "damn"])
+        spy.assert_called_once()
+        self.assertEqual(spy.call_args[0][0], ["damn", "ok"])
+
+    def test_without_optional_packages(self):
+        """Without numpy and pandas, values are factorized in pure Python."""
+        with mock.patch("magic_profanity.columns._optional", return_value=None):
+            self.assertEqual(self.profanity_filter.censor_array(iter(["damn", None, "damn"])), ["****", None, "****"])
+            self.assertEqual(self.profanity_filter.has_profanity_array(self.values),
+                             [True, False, False, False, True, True])
+
+    @unittest.skipUnless(HAVE_PANDAS, "needs pandas")
+    def test_series(self):
+        """Series keep their index, name and dtype."""
+        import pandas
+
+        series = pandas.Series(["damn it", None, "hello"], index=[10, 20, 30], name="message", dtype="string")
+        censored = self.profanity_filter.censor_array(series)
+        self.assertEqual(censored.dtype, series.dtype)
+        self.assertEqual(censored.name, "message")
+        self.assertEqual(censored.tolist(), ["**** it", pandas.NA, "hello"])
+        mask = self.profanity_filter.has_profanity_array(series)
+        self.assertEqual(mask.dtype, bool)
+        self.assertEqual(mask.to_dict(), {10: True, 20: False, 30: False})
+
+    @unittest.skipUnless(HAVE_PANDAS, "needs pandas")
+    def test_numpy_array(self):
+        """NumPy arrays give arrays of plain strings and a boolean mask."""
+        import numpy
+
+        values = numpy.array(["shit", "ok", "shit"])
+        censored = self.profanity_filter.censor_array(values)
+        self.assertIsInstance(censored, numpy.ndarray)
+        self.assertEqual([type(value) for value in censored], [str] * 3)
+        self.assertEqual(censored.tolist(), ["****", "ok", "****"])
+        self.assertEqual(self.profanity_filter.has_profanity_array(values).tolist(), [True, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import io
+import unittest
+from magic_profanity.engine import iter_spans, token_pattern, tokenize
+from magic_profanity.magic_profanity import ProfanityFilter
+
+
+class TestTrieEngine(unittest.TestCase):
+    def setUp(self):
+        self.profanity_filter = ProfanityFilter()
+        self.legacy_filter = ProfanityFilter(engine="legacy")
+
+    def test_tokens(self):
+        """Tokens are maximal runs of allowed characters, stored as flat offsets."""
+        self.assertEqual(list(self.profanity_filter.tokenize("a$$, hi-thére")), [0, 3, 5, 7, 8, 13])
+        self.assertEqual(list(self.profanity_filter.tokenize("  ")), [])
+        pattern = token_pattern({"a", "-", "]", "\\"})
+        self.assertEqual(list(tokenize("a-]\\ b a", pattern)), [0, 4, 7, 8])
+
+    def test_single_words(self):
+        """Single words and their leetspeak variants are censored."""
+        self.assertEqual(self.profanity_filter.censor_text("Damn it, sh1t!"), "**** it, ****!")
+        self.assertEqual(self.profanity_filter.censor_text("phuck you"), "**** you")
+
+    def test_multi_word_spans(self):
+        """Phrases are censored as one span, with or without their separators."""
+        self.assertEqual(self.profanity_filter.censor_text("mother fucker!"), "****!")
+        self.assertEqual(self.profanity_filter.censor_text("ass hole x"), "**** x")
+        self.assertEqual(self.profanity_filter.censor_text("f u c k"), "****")
+        self.assertEqual(self.profanity_filter.censor_text("a 2 girls 1 cup b"), "a **** b")
+
+    def test_spans_report_entries(self):
+        """Spans carry the offsets and the wordlist entry that matched."""
+        index = self.profanity_filter.censor_wordset
+        pattern = token_pattern(self.profanity_filter.allowed_characters)
+        spans = list(iter_spans("oh sh1t", index, pattern, 1))
+        self.assertEqual(spans, [(3, 7, "shit")])
+
+    def test_matches_legacy_detection(self):
+        """Both engines flag the same texts."""
+        texts = ["This damn product", "hello world", "mother fucker!", "b00bs", "class"]
+        for text in texts:
+            self.assertEqual(self.profanity_filter.has_profanity(text),
+                             self.legacy_filter.has_profanity(text), text)
+
+    def test_detection_modes(self):
+        """Detection helpers report matches without censoring."""
+        text = "Damn, this sh1t is damn good"
+        self.assertTrue(self.profanity_filter.has_profanity(text))
+        self.assertEqual(self.profanity_filter.count_profanity(text), 3)
+        self.assertEqual(self.profanity_filter.first_match(text), "Damn")
+        self.assertEqual(self.profanity_filter.count_profanity("all clean"), 0)
+        self.assertIsNone(self.profanity_filter.first_match("all clean"))
+
+    def test_iter_matches(self):
+        """Matches are yielded lazily with offsets, matched text and entry."""
+        text = "Oh sh1t, mother fucker!"
+        matches = self.profanity_filter.iter_matches(text)
+        self.assertEqual(next(matches), (3, 7, "sh1t", "shit"))
+        start, end, matched, entry = next(matches)
+        self.assertEqual((text[start:end], matched, entry), ("mother fucker", "mother fucker", "motherfucker"))
+        self.assertIsNone(next(matches, None))
+
+    def test_censor_stream(self):
+        """Streaming output matches censor_text wherever the chunks are split."""
+        text = "Oh sh1t, what a mother fucker! " + "x" * 300 + "damn " + "2 girls 1 cup, fine."
+        expected = self.profanity_filter.censor_text(text)
+        for size in (1, 3, 8, 64, 1000):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            self.assertEqual("".join(self.profanity_filter.censor_stream(chunks)), expected, size)
+        stream = self.profanity_filter.censor_stream(io.StringIO(text), chunk_size=5)
+        self.assertEqual("".join(stream), expected)
+
+    def test_legacy_single_word_lookahead(self):
+        """With single-word lists the legacy engine looks ahead from every other word, as it always did."""
+        legacy = ProfanityFilter(["fuck", "shit"], engine="legacy")
+        # Output of the original implementation
+        expected = {"hello fu ck": "hello fu ck", "b!fu, ck, b ": "b!fu, ck, b ", "fu ck sh it": "****  **** ",
+                    "x fu ck sh it now": "x fu ck sh it now"}
+        self.assertEqual({text: legacy.censor_text(text) for text in expected}, expected)
+        self.assertFalse(legacy.has_profanity("hello fu ck"))
+
+    def test_censor_stream_legacy(self):
+        """Streaming with the legacy engine gives what its censor_text does."""
+        legacy = ProfanityFilter(engine="legacy")
+        text = "ass hole x, oh sh1t"
+        self.assertEqual("".join(legacy.censor_stream([text[i:i + 4] for i in range(0, len(text), 4)])),
+                         legacy.censor_text(text))
+
+    def test_unknown_engine(self):
+        """Unknown engine names are rejected."""
+        with self.assertRaises(ValueError):
+            ProfanityFilter(engine="regex")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from magic_profanity.enhancement import TextEnhancer
+
+
+class TestTextEnhancer(unittest.TestCase):
+    def setUp(self):
+        self.enhancer = TextEnhancer()
+
+    def test_suggestions_in_pattern_order(self):
+        """Suggestions are grouped by pattern, then ordered by position."""
+        text = "You should always fix it. Damn, it is very stupid, damn!"
+        suggestions = self.enhancer.suggest_improvements(text)
+        self.assertEqual([item['original'] for item in suggestions['politeness_improvements']],
+                         ['Damn', 'damn', 'stupid'])
+        self.assertEqual([item['original'] for item in suggestions['clarity_improvements']], ['always', 'very'])
+        self.assertEqual([item['original'] for item in suggestions['tone_improvements']], ['You should'])
+        self.assertEqual(suggestions['politeness_improvements'][1]['position'], (51, 55))
+        self.assertEqual(suggestions['tone_improvements'][0]['context'], "...[You should] always fix it. Damn...")
+
+    def test_overall_recommendations(self):
+        """Long sentences and repeated words are reported."""
+        text = " ".join(["word"] * 21) + ". Thing, thing: THING thing! this this this this"
+        recommendations = self.enhancer.suggest_improvements(text)['overall_recommendations']
+        self.assertEqual(recommendations, [
+            "Consider breaking up long sentences to improve clarity",
+            "Consider using synonyms for frequently used words: word, thing",
+        ])
+        short = " ".join(["word"] * 20) + ". " + " ".join(["word"] * 20)
+        self.assertEqual(self.enhancer.suggest_improvements(short)['overall_recommendations'],
+                         ["Consider using synonyms for frequently used words: word"])
+
+    def test_changed_patterns(self):
+        """Changes to improvement_patterns are picked up."""
+        self.enhancer.improvement_patterns[r'\bkinda|sorta\b'] = ['somewhat']
+        suggestions = self.enhancer.suggest_improvements("sorta kinda")
+        self.assertEqual([item['original'] for item in suggestions['tone_improvements']], ['sorta', 'kinda'])
+
+    def test_overlapping_patterns(self):
+        """Patterns whose matches overlap each report their own match."""
+        self.enhancer.improvement_patterns[r'\bvery good\b'] = ['excellent']
+        suggestions = self.enhancer.suggest_improvements("this is very good")
+        self.assertEqual([(item['original'], item['position']) for item in suggestions['clarity_improvements']],
+                         [('very', (8, 12)), ('very good', (8, 17))])
+
+
+if __name__ == "__main__":
+    unittest.main()
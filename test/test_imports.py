@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_skips_nltk(self):
+        """Importing the package for censoring does not load nltk or build the default filter."""
+        code = (
+            "import sys, magic_profanity\n"
+            "assert 'nltk' not in sys.modules\n"
+            "assert 'profanity' not in vars(magic_profanity)\n"
+            "assert magic_profanity.profanity.has_profanity('damn')\n"
+            "assert magic_profanity.ProfanityFilter(enable_enhancement=True).text_enhancer\n"
+            "assert 'nltk' not in sys.modules\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=root)
+
+    def test_local_lexicon(self):
+        """A local lexicon file is used without touching nltk data."""
+        from magic_profanity.sentiment import SentimentAnalyzer
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "vader_lexicon.txt")
+            with open(path, "w", encoding="utf-8") as lexicon_file:
+                lexicon_file.write("love\t3.2\t0.4\t[3, 3, 4]\nhate\t-2.7\t0.6\t[-3, -2, -3]")
+
+            analyzer = SentimentAnalyzer(lexicon_path=path, auto_download=False)
+            self.assertEqual(analyzer.get_sentiment("I love it"), "positive")
+            self.assertEqual(analyzer.get_sentiment("I hate it"), "negative")
+            self.assertEqual(analyzer.get_sentiment("It is a chair"), "neutral")
+
+    def test_compiled_allowed_characters(self):
+        """The compiled character set is used while it matches unicode.json, and ignored after it changes."""
+        from magic_profanity import constants
+        from magic_profanity.engine import char_class
+
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "unicode.json")
+            compiled = os.path.join(directory, "unicode.marshal")
+            with open(json_path, "w", encoding="utf-8") as json_file:
+                json_file.write('["\u00e9", "\u00fc"]')
+            constants.compile_allowed_characters(compiled, json_path)
+
+            characters, source = constants.load_allowed_characters(json_path, compiled)
+            self.assertEqual(characters, constants.BASE_CHARACTERS | {"\u00e9", "\u00fc"})
+            self.assertEqual(source, char_class(characters) + "+")
+
+            with open(json_path, "w", encoding="utf-8") as json_file:
+                json_file.write('["\u00e9"]')
+            self.assertEqual(constants.load_allowed_characters(json_path, compiled),
+                             (constants.BASE_CHARACTERS | {"\u00e9"}, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
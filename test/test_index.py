@@ -0,0 +1,79 @@
+import unittest
+from magic_profanity import variant
+from magic_profanity.index import WordIndex
+from magic_profanity.magic_profanity import ProfanityFilter
+from magic_profanity.variant import VariantString
+
+
+class TestWordIndex(unittest.TestCase):
+    def setUp(self):
+        self.char_map = ProfanityFilter().char_map
+        self.words = ["ass", "shit", "mother fucker", "a$$", "f-u-c-k"]
+        self.index = WordIndex(self.words, char_map=self.char_map)
+
+    def test_lookup_matches_variant_string(self):
+        """Index lookups agree with VariantString comparisons."""
+        variants = [VariantString(word, char_map=self.char_map) for word in self.words]
+        candidates = ["ass", "@$$", "a55", "sh1t", "$h*t", "shiit", "mother fucker",
+                      "m0ther phucker", "a$$", "f-u-c-k", "f-v-(-|<", "as", "", "hello"]
+        for candidate in candidates:
+            self.assertEqual(
+                candidate in self.index,
+                any(variant == candidate for variant in variants),
+                f"Mismatch for {candidate!r}"
+            )
+
+    def test_lookup_returns_entry(self):
+        """lookup returns the wordlist entry a string matched."""
+        self.assertEqual(self.index.lookup("5h1t"), "shit")
+        self.assertIsNone(self.index.lookup("shirt"))
+
+    def test_container_protocol(self):
+        """The index behaves like the list it replaces."""
+        self.assertEqual(len(self.index), len(self.words))
+        self.assertTrue(all(isinstance(word, VariantString) for word in self.index))
+        self.assertNotIn(42, self.index)
+        self.index.add("ass")
+        self.assertEqual(len(self.index), len(self.words))
+
+    def test_char_map_replacement(self):
+        """Words added after replacing char_map use the new mappings."""
+        profanity_filter = ProfanityFilter(["darn"])
+        profanity_filter.char_map = {"o": ("o", "0")}
+        profanity_filter.add_custom_words(["heck", "gosh"])
+        self.assertTrue(profanity_filter.has_profanity("g0sh"))
+        self.assertFalse(profanity_filter.has_profanity("h3ck"))
+
+    def test_length_bounds(self):
+        """The index keeps length bounds over every variant of every word."""
+        variants = [VariantString(word, char_map=self.char_map) for word in self.words]
+        self.assertEqual(self.index.min_length, min(variant._min_len for variant in variants))
+        self.assertEqual(self.index.max_length, max(variant._max_len for variant in variants))
+        self.assertIsNone(self.index.lookup("a" * 100))
+        self.assertIsNone(WordIndex().lookup(""))
+
+    def test_compact_variant_strings(self):
+        """Variant strings have no instance dict and share substitution tuples."""
+        first = VariantString("sass", char_map=self.char_map)
+        second = VariantString("ass", char_map=self.char_map)
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertIs(first._char_combos[1], self.char_map["a"])
+        self.assertIs(first._char_combos[2], second._char_combos[1])
+
+        char_map = {"a": ("a", "4")}
+        self.assertEqual(VariantString("ab", char_map=char_map), "4b")
+        char_map["b"] = ("b", "8")
+        self.assertEqual(VariantString("ab", char_map=char_map), "48")
+
+    def test_char_tables_shared_and_bounded(self):
+        """Filters with equal char maps share one table, and discarded maps do not pile up."""
+        first, second = ProfanityFilter(["abc"]), ProfanityFilter(["abc"])
+        self.assertIsNot(first.char_map, second.char_map)
+        self.assertIs(variant.char_table(first.char_map), variant.char_table(second.char_map))
+        for number in range(2 * variant._MAX_CHAR_TABLES):
+            variant.char_table({"a": ("a", str(number))})
+        self.assertLessEqual(len(variant._char_tables), variant._MAX_CHAR_TABLES)
+
+
+if __name__ == "__main__":
+    unittest.main()
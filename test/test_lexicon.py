@@ -0,0 +1,114 @@
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+from magic_profanity.lexicon import (
+    LexiconScorer,
+    default_lexicon,
+    load_compiled_lexicon,
+    save_compiled_lexicon,
+    vader_words,
+)
+from magic_profanity.magic_profanity import ProfanityFilter
+from magic_profanity.sentiment import SentimentAnalyzer, _vader_from_lexicon
+
+
+class TestLexiconScorer(unittest.TestCase):
+    def setUp(self):
+        self.scorer = LexiconScorer()
+        self.texts = [
+            "This product is GREAT, I love it!!!",
+            "not good, never so good, kind of good but very BAD",
+            "I don't hate it :) at least it is not the worst... sort of okay???",
+            "the shit is the bomb, yeah right",
+            "good good bad good. Nothing is good! a! x",
+            "",
+        ]
+
+    def test_matches_vader(self):
+        """Scores equal nltk's VADER run with the same lexicon."""
+        vader = _vader_from_lexicon(dict(default_lexicon()))
+        for text in self.texts:
+            self.assertEqual(self.scorer.polarity_scores(text), vader.polarity_scores(text), text)
+
+    def test_profanity_tokens(self):
+        """Reused profanity tokens give the same scores, except for emoticons."""
+        profanity_filter = ProfanityFilter()
+        for text in self.texts[:2] + self.texts[3:]:
+            self.assertEqual(self.scorer.polarity_scores(text, profanity_filter.tokenize(text)),
+                             self.scorer.polarity_scores(text), text)
+        self.assertEqual(vader_words("great :)"), ["great", ":)"])
+        text = "great :)"
+        self.assertLess(self.scorer.polarity_scores(text, profanity_filter.tokenize(text))["compound"],
+                        self.scorer.polarity_scores(text)["compound"])
+
+    def test_custom_lexicon_is_not_shared(self):
+        """Custom words go into a copy, never into the bundled lexicon."""
+        scorer = LexiconScorer(custom_lexicon={"frobnicate": 2.5})
+        self.assertGreater(scorer.polarity_scores("frobnicate")["compound"], 0)
+        self.assertNotIn("frobnicate", default_lexicon())
+        self.assertEqual(LexiconScorer().polarity_scores("frobnicate")["compound"], 0)
+
+    def test_pickle(self):
+        """Copies of the default scorer reload the bundled lexicon instead of carrying it."""
+        self.assertLess(len(pickle.dumps(self.scorer)), 200)
+        self.assertIs(pickle.loads(pickle.dumps(self.scorer)).lexicon, default_lexicon())
+        custom = pickle.loads(pickle.dumps(LexiconScorer(custom_lexicon={"frobnicate": 2.5})))
+        self.assertEqual(custom.lexicon["frobnicate"], 2.5)
+
+    def test_compiled_lexicon(self):
+        """Compiled lexicons round trip and foreign files are rejected."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "lexicon.marshal")
+            save_compiled_lexicon(path, {"good": 1.9}, source="digest")
+            self.assertEqual(load_compiled_lexicon(path), ({"good": 1.9}, "digest"))
+            with open(path, "wb") as compiled_file:
+                compiled_file.write(b"not a lexicon")
+            with self.assertRaises(ValueError):
+                load_compiled_lexicon(path)
+
+
+class TestSentimentBackends(unittest.TestCase):
+    def test_lexicon_backend_skips_nltk(self):
+        """The lexicon backend works without importing nltk."""
+        code = ("import sys; from magic_profanity.sentiment import SentimentAnalyzer; "
+                "print(SentimentAnalyzer(backend='lexicon').get_sentiment('I love it'), 'nltk' in sys.modules)")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(output.stdout.split(), ["positive", "False"])
+
+    def test_custom_lexicon(self):
+        """custom_lexicon applies to the analyzer without changing the shared lexicon."""
+        analyzer = SentimentAnalyzer(backend="lexicon", custom_lexicon={"frobnicate": -2.5})
+        self.assertEqual(analyzer.get_sentiment("frobnicate"), "negative")
+        self.assertNotIn("frobnicate", default_lexicon())
+
+    def test_custom_backend(self):
+        """Any object with polarity_scores can be the backend."""
+        class Constant:
+            def polarity_scores(self, text):
+                return {"neg": 0.0, "neu": 0.0, "pos": 1.0, "compound": 0.9}
+
+        analyzer = SentimentAnalyzer(backend=Constant())
+        self.assertEqual(analyzer.get_sentiment("anything"), "positive")
+        self.assertFalse(analyzer.accepts_tokens)
+        with self.assertRaises(ValueError):
+            SentimentAnalyzer(backend=Constant(), custom_lexicon={"good": 1.0})
+        with self.assertRaises(ValueError):
+            SentimentAnalyzer(backend="textblob")
+
+    def test_pipeline_reuses_tokens(self):
+        """analyze_text scores with the tokens of the censor stage."""
+        profanity_filter = ProfanityFilter(enable_sentiment=True, sentiment_options={"backend": "lexicon"})
+        analyzer = profanity_filter.sentiment_analyzer
+        text = "This damn thing is great :)"
+        result = profanity_filter.analyze_text(text, stages=["censor", "sentiment"])
+        self.assertEqual(result["censored_text"], "This **** thing is great :)")
+        self.assertEqual(result["sentiment"]["scores"], analyzer.score(text, profanity_filter.tokenize(text)))
+        self.assertNotEqual(result["sentiment"]["scores"], analyzer.analyze(text))
+
+
+if __name__ == "__main__":
+    unittest.main()
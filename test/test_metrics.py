@@ -0,0 +1,80 @@
+import pickle
+import unittest
+from magic_profanity.magic_profanity import ProfanityFilter
+from magic_profanity.metrics import Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.metrics = Metrics(callback=lambda *call: self.calls.append(call))
+        self.profanity_filter = ProfanityFilter(metrics=self.metrics)
+
+    def test_censor_counters(self):
+        """censor_text counts the texts, characters, words and matches it handled."""
+        text = "Oh sh1t, what a mother fucker"
+        self.assertEqual(self.profanity_filter.censor_text(text), "Oh ****, what a ****")
+        counters = self.metrics.stats()["counters"]
+        self.assertEqual(counters["texts"], 1)
+        self.assertEqual(counters["characters"], len(text))
+        self.assertEqual(counters["tokens"], 6)
+        self.assertEqual(counters["matches"], 2)
+        self.assertGreater(counters["lookaheads"], 0)
+        self.assertGreaterEqual(counters["lookups"], counters["tokens"] - 1)
+        self.assertGreater(counters["trie_steps"], counters["lookups"])
+
+    def test_callback(self):
+        """The callback gets the operation, its duration and the counts of that call."""
+        self.profanity_filter.has_profanity("damn it, and more words after that")
+        operation, seconds, counts = self.calls[-1]
+        self.assertEqual(operation, "has_profanity")
+        self.assertGreater(seconds, 0)
+        # Detection stops at the first match: the first word alone, then
+        # joined with the words after it
+        self.assertEqual(counts["matches"], 1)
+        self.assertEqual((counts["lookups"], counts["lookaheads"]), (2, 1))
+
+    def test_analysis_stages(self):
+        """analyze_text records its own latency and that of every stage."""
+        profanity_filter = ProfanityFilter(enable_enhancement=True, metrics=self.metrics)
+        profanity_filter.analyze_text("You should never say damn")
+        timings = self.metrics.stats()["timings"]
+        self.assertEqual(set(timings), {"analyze_text", "analyze_text.censor", "analyze_text.enhancement"})
+        self.assertEqual(self.metrics.stats()["counters"]["matches"], 1)
+        profanity_filter.text_enhancer.suggest_improvements("You should")
+        self.assertEqual(self.metrics.stats()["timings"]["enhancement.suggest_improvements"]["count"], 1)
+
+    def test_histograms(self):
+        """Latencies are counted into cumulative buckets."""
+        metrics = Metrics(buckets=(0.5, 0.1))
+        for seconds in (0.05, 0.1, 0.3, 2.0):
+            metrics.record("censor_text", seconds)
+        timing = metrics.stats()["timings"]["censor_text"]
+        self.assertEqual(timing["buckets"], [(0.1, 2), (0.5, 3), (float("inf"), 4)])
+        self.assertEqual(timing["count"], 4)
+        self.assertAlmostEqual(timing["sum"], 2.45)
+
+    def test_prometheus(self):
+        """Metrics export in the Prometheus text format."""
+        self.profanity_filter.censor_text("damn")
+        text = self.metrics.to_prometheus()
+        self.assertIn("# TYPE magic_profanity_texts_total counter\nmagic_profanity_texts_total 1\n", text)
+        self.assertIn('magic_profanity_operation_seconds_bucket{operation="censor_text",le="+Inf"} 1\n', text)
+        self.assertIn('magic_profanity_operation_seconds_count{operation="censor_text"} 1\n', text)
+
+    def test_reset_and_pickle(self):
+        """Metrics can be reset, and copies in other processes start empty."""
+        self.profanity_filter.censor_text("damn")
+        copied = pickle.loads(pickle.dumps(self.profanity_filter))
+        self.assertEqual(copied.metrics.stats()["counters"]["texts"], 0)
+        self.assertIsNone(copied.metrics.callback)
+        self.metrics.reset()
+        self.assertEqual(self.metrics.stats(), {"counters": dict.fromkeys(self.metrics.counters, 0), "timings": {}})
+
+    def test_disabled_by_default(self):
+        """Filters record nothing unless given a Metrics."""
+        self.assertIsNone(ProfanityFilter().metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
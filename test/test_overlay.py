@@ -0,0 +1,61 @@
+import unittest
+from magic_profanity.index import OverlayIndex
+from magic_profanity.magic_profanity import ProfanityFilter
+from magic_profanity.shared import FlatIndex, flatten
+
+
+class TestOverlayFilters(unittest.TestCase):
+    def setUp(self):
+        self.base = ProfanityFilter(["darn", "heck", "gosh"])
+        self.tenant = self.base.overlay(["sucks"], whitelist_words=["Heck"])
+
+    def test_overlay_adds_and_allows(self):
+        """A tenant censors its own words and skips its allowed ones."""
+        text = "darn, that sucks! h3ck"
+        self.assertEqual(self.tenant.censor_text(text), "****, that ****! h3ck")
+        self.assertEqual(self.base.censor_text(text), "****, that sucks! ****")
+        self.assertEqual(sorted(self.tenant.censor_wordset.words()), ["darn", "gosh", "sucks"])
+        self.assertEqual(len(self.tenant.censor_wordset), 3)
+
+    def test_base_is_shared(self):
+        """Tenants reference the base index instead of copying it."""
+        other = self.base.overlay(["dang"])
+        self.assertIs(self.tenant.censor_wordset.base, self.base.censor_wordset)
+        self.assertIs(other.censor_wordset.base, self.base.censor_wordset)
+        self.assertFalse(other.has_profanity("sucks"))
+
+    def test_allowed_word_does_not_hide_other_matches(self):
+        """Allowing a word still lets other words match the same text."""
+        base = ProfanityFilter(["ass", "a$$"])
+        tenant = base.overlay(whitelist_words=["ass"])
+        self.assertEqual(tenant.censor_text("ass"), "ass")
+        self.assertEqual(tenant.censor_text("a$$"), "****")
+
+    def test_tenant_updates(self):
+        """Updating a tenant changes only its overlay."""
+        self.tenant.add_custom_words(["heck", "golly"])
+        self.tenant.remove_words(["gosh", "sucks"])
+        self.assertEqual(self.tenant.censor_text("heck golly gosh sucks"), "**** **** gosh sucks")
+        self.assertEqual(self.base.censor_text("heck golly gosh sucks"), "**** golly **** sucks")
+        self.assertIsInstance(self.tenant.censor_wordset, OverlayIndex)
+
+    def test_rebase(self):
+        """Rebasing keeps the overlay on top of a newer base."""
+        self.base.add_custom_words(["sucks", "dang"])
+        self.assertFalse(self.tenant.has_profanity("dang"))
+        self.tenant.rebase(self.base)
+        self.assertEqual(self.tenant.censor_text("dang heck sucks"), "**** heck ****")
+        self.assertEqual(len(self.tenant.censor_wordset), 4)
+        with self.assertRaises(TypeError):
+            self.base.rebase(self.tenant)
+
+    def test_flat_base(self):
+        """Overlays work on top of a shared flat index."""
+        base = ProfanityFilter(words=FlatIndex(flatten(self.base.censor_wordset)))
+        tenant = base.overlay(["sucks"], whitelist_words=["heck"])
+        self.assertEqual(tenant.censor_text("darn heck sucks"), "**** heck ****")
+        self.assertEqual(tenant.first_match("gosh"), "gosh")
+
+
+if __name__ == "__main__":
+    unittest.main()
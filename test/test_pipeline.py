@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from magic_profanity import prefilter
+from magic_profanity.magic_profanity import ProfanityFilter
+from magic_profanity.metrics import Metrics
+
+
+class TestAnalysisPipeline(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.lexicon_path = os.path.join(cls.directory.name, "vader_lexicon.txt")
+        with open(cls.lexicon_path, "w", encoding="utf-8") as lexicon_file:
+            lexicon_file.write("love\t3.2\t0.4\t[3, 3, 4]\nhate\t-2.7\t0.6\t[-3, -2, -3]")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.profanity_filter = ProfanityFilter(
+            enable_sentiment=True,
+            sentiment_options={'lexicon_path': self.lexicon_path, 'auto_download': False},
+            enable_enhancement=True
+        )
+        # Count the VADER calls
+        self.calls = 0
+        analyzer = self.profanity_filter.sentiment_analyzer.analyzer
+        polarity_scores = analyzer.polarity_scores
+
+        def counting_polarity_scores(text):
+            self.calls += 1
+            return polarity_scores(text)
+
+        analyzer.polarity_scores = counting_polarity_scores
+
+    def test_sentiment_scored_once(self):
+        """Each analysis runs VADER once, with or without details."""
+        text = "I hate this damn thing. You should fix it."
+        for detailed in (False, True):
+            self.calls = 0
+            result = self.profanity_filter.analyze_text(text, detailed=detailed)
+            self.assertEqual(self.calls, 1)
+            self.assertEqual(result['censored_text'], "I hate this **** thing. You should fix it.")
+            self.assertEqual(result['sentiment']['classification'], 'negative')
+            self.assertEqual(result['sentiment']['scores'], self.profanity_filter.sentiment_analyzer.analyze(text))
+            self.assertIn('enhancement_suggestions', result)
+
+    def test_stage_selection(self):
+        """Only the requested stages run."""
+        result = self.profanity_filter.analyze_text("I love it", stages=["sentiment"])
+        self.assertEqual(list(result), ['sentiment'])
+        self.assertEqual(result['sentiment']['classification'], 'positive')
+
+        self.calls = 0
+        result = self.profanity_filter.analyze_text("damn", stages=("enhancement", "censor"))
+        self.assertEqual(list(result), ['censored_text', 'contains_profanity', 'enhancement_suggestions'])
+        self.assertEqual(self.calls, 0)
+
+    def test_ruled_out_text_not_tokenized(self):
+        """Texts the prefilter rules out are never tokenized, and the enhancer is timed once as a stage."""
+        metrics = Metrics()
+        profanity_filter = ProfanityFilter(enable_enhancement=True, metrics=metrics)
+        with mock.patch.object(prefilter, "BUILD_AFTER", 1):
+            profanity_filter.censor_text("")
+            prefilter._prefilters[profanity_filter.censor_wordset][4].join()
+        with mock.patch.object(profanity_filter, "tokenize", wraps=profanity_filter.tokenize) as tokenize:
+            result = profanity_filter.analyze_text("Good morning, see you soon!")
+        tokenize.assert_not_called()
+        self.assertFalse(result['contains_profanity'])
+        timings = metrics.stats()["timings"]
+        self.assertIn("analyze_text.enhancement", timings)
+        self.assertNotIn("enhancement.suggest_improvements", timings)
+
+    def test_invalid_stages(self):
+        """Unknown stages and stages the filter was not set up for are rejected."""
+        with self.assertRaises(ValueError):
+            self.profanity_filter.analyze_text("hi", stages=["translation"])
+        with self.assertRaises(ValueError):
+            ProfanityFilter().analyze_text("hi", stages=["sentiment"])
+        self.assertEqual(list(ProfanityFilter().analyze_text("hi")), ['censored_text', 'contains_profanity'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import random
+import unittest
+from unittest import mock
+from magic_profanity import prefilter
+from magic_profanity.magic_profanity import ProfanityFilter
+from magic_profanity.metrics import Metrics
+from magic_profanity.prefilter import Prefilter, prefilter_for
+
+
+def wait_for_build(index):
+    thread = prefilter._prefilters[index][4]
+    if thread is not None:
+        thread.join()
+
+
+class TestPrefilter(unittest.TestCase):
+    def setUp(self):
+        self.profanity_filter = ProfanityFilter(prefilter=False)
+        self.profanity_filter.load_words()
+        self.prefilter = Prefilter(self.profanity_filter.censor_wordset, self.profanity_filter.allowed_characters)
+
+    def test_no_false_negatives(self):
+        """Every text the full matcher censors gets through, whatever its spelling."""
+        rng = random.Random(7)
+        words = sorted(self.profanity_filter.censor_wordset.words())
+        char_map = self.profanity_filter.char_map
+        for _ in range(3000):
+            word = rng.choice(words)
+            spelled = "".join(rng.choice(char_map.get(char, (char,))) if rng.random() < 0.4 else char
+                              for char in word)
+            spelled = "".join(char.upper() if rng.random() < 0.3 else char for char in spelled)
+            cut = rng.randrange(len(spelled) + 1)
+            spelled = spelled[:cut] + rng.choice(["", " ", ". ", "|", "\n"]) + spelled[cut:]
+            text = rng.choice(["", "so ", "a "]) + spelled + rng.choice(["", "!", " now", "s"])
+            if self.profanity_filter.has_profanity(text):
+                self.assertTrue(self.prefilter.may_match(text), text)
+
+    def test_rules_out_clean_text(self):
+        """Texts without any word that starts a wordlist entry are ruled out."""
+        self.assertFalse(self.prefilter.may_match("Good morning, see you soon!"))
+        self.assertFalse(self.prefilter.may_match(""))
+        self.assertTrue(self.prefilter.may_match("what the F.U.C.K"))
+        # Only ASCII texts are searched
+        self.assertTrue(self.prefilter.may_match("Good morning, see you soon! ☺"))
+        self.assertEqual(self.prefilter.false_positive_rate(["Good morning", "an assessment"]), 0.5)
+
+    def test_same_results(self):
+        """Filters give the same results with and without the prefilter, overlays included."""
+        texts = ["hello world", "What the FUCK", "sh1t happens", "a s s", "an assessment", "my widget",
+                 "d a m n it", "Σ damn", "ph u c k"]
+        with mock.patch.object(prefilter, "BUILD_AFTER", 1):
+            filtered = ProfanityFilter()
+            filtered.censor_text("")
+            wait_for_build(filtered.censor_wordset)
+            tenant = filtered.overlay(["widget"], ["damn"])
+            wait_for_build(tenant.censor_wordset)
+            self.assertEqual([filtered.censor_text(text) for text in texts],
+                             [self.profanity_filter.censor_text(text) for text in texts])
+            reference = self.profanity_filter.overlay(["widget"], ["damn"])
+            self.assertEqual([tenant.censor_text(text) for text in texts],
+                             [reference.censor_text(text) for text in texts])
+
+    def test_built_after_use(self):
+        """The prefilter is compiled in the background once an index has scanned BUILD_AFTER texts."""
+        index = ProfanityFilter(["widget"]).censor_wordset
+        allowed = self.profanity_filter.allowed_characters
+        with mock.patch.object(prefilter, "BUILD_AFTER", 3):
+            self.assertIsNone(prefilter_for(index, allowed))
+            self.assertIsNone(prefilter_for(index, allowed))
+            self.assertIsNone(prefilter._prefilters[index][4])
+            prefilter_for(index, allowed)
+            wait_for_build(index)
+            self.assertIsInstance(prefilter_for(index, allowed), Prefilter)
+
+    def test_rebuilt_on_publish(self):
+        """A filter with a prefilter starts compiling one for every new wordlist right away."""
+        filtered = ProfanityFilter()
+        with mock.patch.object(prefilter, "BUILD_AFTER", 1):
+            filtered.censor_text("")
+            wait_for_build(filtered.censor_wordset)
+        filtered.add_custom_words(["widget"])
+        wait_for_build(filtered.censor_wordset)
+        self.assertIsInstance(prefilter_for(filtered.censor_wordset, filtered.allowed_characters), Prefilter)
+        self.assertEqual(filtered.censor_text("my widget"), "my ****")
+        # Filters that never got a prefilter do not start one
+        idle = ProfanityFilter(["widget"])
+        idle.add_custom_words(["gadget"])
+        self.assertNotIn(idle.censor_wordset, prefilter._prefilters)
+
+    def test_metrics(self):
+        """Skipped texts and false positives are counted."""
+        metrics = Metrics()
+        profanity_filter = ProfanityFilter(metrics=metrics)
+        with mock.patch.object(prefilter, "BUILD_AFTER", 1):
+            profanity_filter.censor_text("")
+            wait_for_build(profanity_filter.censor_wordset)
+            for text in ("good morning", "an assessment", "damn"):
+                profanity_filter.censor_text(text)
+        counters = metrics.stats()["counters"]
+        self.assertEqual((counters["prefilter_skips"], counters["prefilter_false_positives"]), (1, 1))
+        self.assertEqual(counters["matches"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
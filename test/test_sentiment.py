@@ -0,0 +1,97 @@
+import os
+import re
+import tempfile
+import unittest
+from magic_profanity.sentiment import EMOTION_PATTERNS, SentimentAnalyzer
+
+
+def detect_separately(text, emotion_patterns):
+    # Reference implementation: every pattern matched on its own
+    results = {}
+    for emotion, patterns in emotion_patterns.items():
+        score = 0
+        for pattern in patterns:
+            score += len(re.findall(pattern, text.lower())) * 0.2
+        if score > 0:
+            results[emotion] = min(1.0, score)
+    return results
+
+
+class TestEmotionDetection(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.lexicon_path = os.path.join(cls.directory.name, "vader_lexicon.txt")
+        with open(cls.lexicon_path, "w", encoding="utf-8") as lexicon_file:
+            lexicon_file.write("love\t3.2\t0.4\t[3, 3, 4]")
+        cls.analyzer = SentimentAnalyzer(lexicon_path=cls.lexicon_path, auto_download=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.texts = [
+            "I am SO happy and excited 😊😊, but also a bit worried.",
+            "Ew, gross! That is disgusting 🤮 and I'm mad 😡 and sad ☹️",
+            "unhappy happiness, mad-sad... great great great great great great",
+            "",
+        ]
+
+    def test_matches_separate_patterns(self):
+        """One pass gives the same scores as matching every pattern separately."""
+        for text in self.texts:
+            self.assertEqual(self.analyzer._detect_emotion_indicators(text),
+                             detect_separately(text, EMOTION_PATTERNS), text)
+
+    def test_changed_patterns(self):
+        """Changes to emotion_patterns are picked up, including arbitrary regexes."""
+        analyzer = SentimentAnalyzer(lexicon_path=self.lexicon_path, auto_download=False)
+        analyzer.emotion_patterns['joy'].append(r'lo+l|:\)')
+        analyzer.emotion_patterns['calm'] = [r'\b(calm|relaxed)\b']
+        text = "lol, loool :) so calm and happy"
+        self.assertEqual(analyzer._detect_emotion_indicators(text),
+                         detect_separately(text, analyzer.emotion_patterns))
+        self.assertEqual(analyzer._detect_emotion_indicators(text)['calm'], 0.2)
+
+
+class TestBulkScoring(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.lexicon_path = os.path.join(cls.directory.name, "vader_lexicon.txt")
+        with open(cls.lexicon_path, "w", encoding="utf-8") as lexicon_file:
+            lexicon_file.write("love\t3.2\t0.4\t[3, 3, 4]\nhate\t-2.7\t0.6\t[-3, -2, -3]")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.analyzer = SentimentAnalyzer(lexicon_path=self.lexicon_path, auto_download=False)
+        self.texts = ["I love it", "I  love it", "I hate it", "It is a chair", "I love it", "I loooove it"]
+
+    def test_analyze_many(self):
+        """Bulk results match scoring every text on its own."""
+        self.assertEqual(self.analyzer.analyze_many(self.texts), [self.analyzer.analyze(text) for text in self.texts])
+        self.assertEqual(self.analyzer.get_sentiment_many(self.texts),
+                         ['positive', 'positive', 'negative', 'neutral', 'positive', 'neutral'])
+
+    def test_duplicates_scored_once(self):
+        """Texts that preprocess to the same string are scored once and remembered."""
+        self.analyzer.analyze_many(self.texts)
+        self.assertEqual(len(self.analyzer.score_cache), 4)
+        results = self.analyzer.analyze_many(self.texts)
+        self.assertEqual(self.analyzer.score_cache.stats()['hits'], 4)
+        results[0]['compound'] = 42
+        self.assertNotEqual(results[4]['compound'], 42)
+
+    def test_process_pool(self):
+        """Scores from worker processes are the same as local ones."""
+        analyzer = SentimentAnalyzer(lexicon_path=self.lexicon_path, auto_download=False, cache_size=0)
+        self.assertEqual(analyzer.analyze_many(self.texts, workers=2, chunksize=1),
+                         [analyzer.analyze(text) for text in self.texts])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import gc
+import os
+import pickle
+import random
+import string
+import tempfile
+import tracemalloc
+import unittest
+from magic_profanity.index import WordIndex
+from magic_profanity.magic_profanity import ProfanityFilter
+from magic_profanity.shared import MIN_DELTA_SIZE, DeltaIndex, FlatIndex, flatten
+from magic_profanity.variant import VariantString
+
+
+class TestFlatIndex(unittest.TestCase):
+    def setUp(self):
+        self.profanity_filter = ProfanityFilter()
+        self.index = FlatIndex(flatten(self.profanity_filter.censor_wordset))
+        self.texts = ["Oh sh1t, what a mother fucker!", "This damn product", "hello world", "b00bs", "a$$hole"]
+
+    def test_matches_word_index(self):
+        """A flat index finds exactly what the index it was built from finds."""
+        flat_filter = ProfanityFilter(words=self.index)
+        for text in self.texts:
+            self.assertEqual(list(flat_filter.iter_matches(text)),
+                             list(self.profanity_filter.iter_matches(text)), text)
+        self.assertEqual(len(self.index), len(self.profanity_filter.censor_wordset))
+        self.assertIn(VariantString("shit"), self.index)
+        self.assertNotIn(VariantString("sh1tt"), self.index)
+
+    def test_read_only(self):
+        """Flat indexes are read-only, updates return a regular index."""
+        with self.assertRaises(TypeError):
+            self.index.add("darn")
+        updated = self.index.updated(add=["darn"])
+        self.assertIsInstance(updated, WordIndex)
+        self.assertNotIsInstance(updated, FlatIndex)
+        self.assertEqual(updated.lookup("d4rn"), "darn")
+
+        flat_filter = ProfanityFilter(words=self.index)
+        flat_filter.add_custom_words(["darn"])
+        self.assertEqual(flat_filter.censor_text("darn sh1t"), "**** ****")
+
+    def test_invalid_buffer(self):
+        """Buffers that do not hold a flat index are rejected."""
+        data = flatten(self.profanity_filter.censor_wordset)
+        for broken in (b"not an index", data[:6] + b"\xff" + data[7:]):
+            with self.assertRaises(ValueError):
+                FlatIndex(broken)
+
+    def test_mapped_file(self):
+        """Compiled files can be saved flat and are mapped when loaded."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "words.flat")
+            self.profanity_filter.save_compiled(path, mapped=True)
+            restored = ProfanityFilter.load_compiled(path)
+            self.assertIsInstance(restored.censor_wordset, FlatIndex)
+            self.assertEqual(restored.censor_text(self.texts[0]), self.profanity_filter.censor_text(self.texts[0]))
+            self.assertEqual(pickle.loads(pickle.dumps(restored.censor_wordset))._source, ("file", path))
+            del restored
+
+    def test_shared_memory(self):
+        """Worker processes attach to the shared block instead of copying it."""
+        block = self.profanity_filter.share_compiled()
+        try:
+            attached = ProfanityFilter.attach_compiled(block.name)
+            expected = [self.profanity_filter.censor_text(text) for text in self.texts]
+            self.assertEqual(attached.censor_many(self.texts), expected)
+            self.assertEqual(attached.censor_many(self.texts, workers=2, chunksize=1), expected)
+            del attached
+        finally:
+            block.close()
+            block.unlink()
+
+
+class TestCompactStorage(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12)))
+                      for _ in range(20000)]
+
+    def test_large_wordlist_memory(self):
+        """A filter keeps a large custom wordlist flat, in a few bytes per character."""
+        tracemalloc.start()
+        try:
+            profanity_filter = ProfanityFilter(self.words)
+            gc.collect()
+            kept = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        self.assertIsInstance(profanity_filter.censor_wordset, FlatIndex)
+        # The dict trie of the same words takes over 15 MB
+        self.assertLess(kept, 4 * 1024 * 1024)
+        self.assertEqual(profanity_filter.censor_text(f"a {self.words[0]} b"), "a **** b")
+
+    def test_updates_kept_as_delta(self):
+        """Small updates are kept on top of the flat index, large ones flattened again."""
+        profanity_filter = ProfanityFilter(self.words[:1000])
+        profanity_filter.add_custom_words(["gosh"])
+        profanity_filter.remove_words([self.words[0]])
+        self.assertIsInstance(profanity_filter.censor_wordset, DeltaIndex)
+        self.assertEqual(profanity_filter.censor_text(f"g0sh {self.words[0]} {self.words[1]}"),
+                         f"**** {self.words[0]} ****")
+        with self.assertRaises(TypeError):
+            profanity_filter.rebase(ProfanityFilter())
+
+        profanity_filter.add_custom_words(self.words[1000:1001 + MIN_DELTA_SIZE])
+        self.assertIsInstance(profanity_filter.censor_wordset, FlatIndex)
+        self.assertEqual(len(profanity_filter.censor_wordset), 1001 + MIN_DELTA_SIZE)
+        self.assertEqual(profanity_filter.censor_text(f"g0sh {self.words[0]}"), f"**** {self.words[0]}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+from magic_profanity.magic_profanity import ProfanityFilter
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "words.snapshot")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """A loaded snapshot censors exactly like the filter that saved it."""
+        profanity_filter = ProfanityFilter()
+        profanity_filter.add_custom_words(["sucks"])
+        profanity_filter.save_compiled(self.path)
+
+        restored = ProfanityFilter.load_compiled(self.path)
+        text = "This damn thing sucks, mother fucker! sh1t."
+        self.assertEqual(restored.censor_text(text), profanity_filter.censor_text(text))
+        self.assertEqual(len(restored.censor_wordset), len(profanity_filter.censor_wordset))
+        self.assertEqual(restored.max_num_combinations, profanity_filter.max_num_combinations)
+
+    def test_restored_filter_accepts_new_words(self):
+        """Words can still be added to a restored filter."""
+        ProfanityFilter(["darn"]).save_compiled(self.path)
+        restored = ProfanityFilter.load_compiled(self.path)
+        restored.add_custom_words(["heck"])
+        self.assertEqual(restored.censor_text("darn h3ck"), "**** ****")
+
+    def test_invalid_files(self):
+        """Files that are not compatible snapshots are rejected."""
+        ProfanityFilter(["darn"]).save_compiled(self.path)
+        with open(self.path, "rb") as snapshot_file:
+            data = snapshot_file.read()
+
+        for broken in (b"not a snapshot", data[:6] + b"\xff" + data[7:], data[:20]):
+            with open(self.path, "wb") as snapshot_file:
+                snapshot_file.write(broken)
+            with self.assertRaises(ValueError):
+                ProfanityFilter.load_compiled(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
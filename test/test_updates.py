@@ -0,0 +1,110 @@
+import os
+import pickle
+import tempfile
+import threading
+import unittest
+from magic_profanity.index import WordIndex
+from magic_profanity.magic_profanity import ProfanityFilter
+
+
+class TestIncrementalUpdates(unittest.TestCase):
+    def setUp(self):
+        self.profanity_filter = ProfanityFilter(["darn", "heck"])
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "words.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_wordlist(self, *words):
+        with open(self.path, "w", encoding="utf-8") as wordlist_file:
+            wordlist_file.write("\n".join(words) + "\n")
+
+    def test_updated_leaves_original_untouched(self):
+        """An updated index shares unchanged trie nodes but never modifies them."""
+        index = WordIndex(["ass", "asshole", "shit"])
+        updated = index.updated(add=["assclown"], remove=["asshole", "shit"])
+        self.assertEqual(sorted(index.words()), ["ass", "asshole", "shit"])
+        self.assertEqual(sorted(updated.words()), ["ass", "assclown"])
+        self.assertEqual(index.lookup("asshole"), "asshole")
+        self.assertIsNone(updated.lookup("asshole"))
+        self.assertNotIn("s", updated._trie)
+        self.assertNotEqual(index.generation, updated.generation)
+
+    def test_add_and_remove_words(self):
+        """Added and removed words take effect immediately."""
+        self.profanity_filter.add_custom_words(["gosh"])
+        self.assertEqual(self.profanity_filter.censor_text("darn g0sh heck"), "**** **** ****")
+        self.profanity_filter.remove_words(["Heck"])
+        self.assertEqual(self.profanity_filter.censor_text("darn g0sh heck"), "**** **** heck")
+        with self.assertRaises(TypeError):
+            self.profanity_filter.remove_words("darn")
+
+    def test_add_updates_max_num_combinations(self):
+        """Phrases added later are matched across all of their words."""
+        self.profanity_filter.add_custom_words(["what the heck"])
+        self.assertEqual(self.profanity_filter.max_num_combinations, 2)
+        self.assertEqual(self.profanity_filter.censor_text("so what the heck"), "so ****")
+
+    def test_updates_invalidate_cache(self):
+        """Cached results from an older wordlist are not served."""
+        profanity_filter = ProfanityFilter(["darn"], cache_size=16)
+        self.assertFalse(profanity_filter.has_profanity("gosh"))
+        profanity_filter.add_custom_words(["gosh"])
+        self.assertTrue(profanity_filter.has_profanity("gosh"))
+
+    def test_reload_from_file(self):
+        """Reloading applies only the difference to the current wordlist."""
+        self.write_wordlist("darn", "Gosh", "dang")
+        self.profanity_filter.reload_from_file(self.path, whitelist_words=["dang"])
+        self.assertEqual(sorted(self.profanity_filter.censor_wordset.words()), ["darn", "gosh"])
+
+    def test_watch(self):
+        """The watcher reloads a changed file once it has settled."""
+        self.write_wordlist("darn")
+        watcher = self.profanity_filter.watch(self.path, interval=60)
+        self.addCleanup(watcher.stop)
+        self.assertFalse(watcher.poll())
+
+        self.write_wordlist("darn", "gosh", "golly")
+        os.utime(self.path, ns=(1, 1))
+        self.assertFalse(watcher.poll())
+        self.assertTrue(watcher.poll())
+        self.assertTrue(self.profanity_filter.has_profanity("golly"))
+        self.assertFalse(self.profanity_filter.has_profanity("heck"))
+
+        os.remove(self.path)
+        self.assertFalse(watcher.poll())
+        self.assertTrue(self.profanity_filter.has_profanity("golly"))
+
+    def test_concurrent_readers(self):
+        """Readers see a complete wordlist while words are added and removed."""
+        profanity_filter = ProfanityFilter()
+        text = "This damn thing, mother fucker! sh1t."
+        expected = profanity_filter.censor_text(text)
+        errors = []
+
+        def read():
+            for _ in range(200):
+                if profanity_filter.censor_text(text) != expected:
+                    errors.append(text)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for number in range(50):
+            profanity_filter.add_custom_words([f"zzword{number}"])
+            profanity_filter.remove_words([f"zzword{number}"])
+        for reader in readers:
+            reader.join()
+        self.assertEqual(errors, [])
+
+    def test_pickle(self):
+        """Filters can still be pickled, e.g. for worker processes."""
+        restored = pickle.loads(pickle.dumps(self.profanity_filter))
+        restored.add_custom_words(["gosh"])
+        self.assertEqual(restored.censor_text("darn gosh"), "**** ****")
+
+
+if __name__ == "__main__":
+    unittest.main()